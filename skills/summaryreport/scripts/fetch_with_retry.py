@@ -3,17 +3,49 @@
 
 from __future__ import annotations
 
+import hashlib
+import http.client
+import io
+import os
+import random
 import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, Optional
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 from urllib import error, request
+from urllib.parse import SplitResult, urljoin, urlsplit
+
+from json_io import load_path, write_json_atomic
 
 BROWSER_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 )
+# Sent when no browser headers are requested, as urllib.request did.
+DEFAULT_USER_AGENT = f"Python-urllib/{request.__version__}"
 
 RETRY_STATUS_CODES = {403, 406, 429}
+# Transient statuses retried with exponential backoff (full jitter), honoring Retry-After.
+BACKOFF_STATUS_CODES = {429, 500, 502, 503, 504}
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+# Per-host concurrency bounds for fetch_many's adaptive (AIMD) limiter.
+HOST_CONCURRENCY_MAX = max(1, int(os.getenv("SUMMARYREPORT_FETCH_HOST_CONCURRENCY_MAX", "16")))
+HOST_LATENCY_TARGET_SECONDS = float(os.getenv("SUMMARYREPORT_FETCH_LATENCY_TARGET_SECONDS", "2.0"))
+# Hold back a host once less than this share of its advertised rate limit remains.
+RATE_LIMIT_RESERVE_RATIO = 0.1
+MAX_HOST_BLOCK_SECONDS = 60.0
+# Loaded once: building a default context re-reads the system CA bundle. SSLContext is thread-safe.
+_SSL_CONTEXT = ssl.create_default_context()
+READ_CHUNK_BYTES = 64 * 1024
+# Leading bytes kept in FetchResult.body when the body is streamed to a file (content sniffing).
+SNIFF_BYTES = 1024
+# Streamed bodies are read into one reused buffer of this size instead of a new bytes per chunk.
+SINK_CHUNK_BYTES = 1 << 20
 
 
 @dataclass
@@ -30,9 +62,143 @@ class FetchError(RuntimeError):
     """Raised when HTTP fetch fails after retries."""
 
 
+class _ConnectionPool:
+    """Keep-alive connections per (scheme, host), one set per thread, so repeat hosts skip TCP/TLS setup."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def _conns(self) -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns
+
+    def discard(self, scheme: str, netloc: str) -> None:
+        conn = self._conns().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def get(
+        self, parts: SplitResult, headers: Dict[str, str], timeout: int
+    ) -> http.client.HTTPResponse:
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        for _ in range(2):
+            conn = self._conns().get(key)
+            reused = conn is not None
+            if conn is None:
+                if parts.scheme == "https":
+                    conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, context=_SSL_CONTEXT)
+                else:
+                    conn = http.client.HTTPConnection(parts.netloc, timeout=timeout)
+                self._conns()[key] = conn
+            else:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.discard(*key)
+                # A reused connection may have been closed by the server while idle; reconnect once.
+                if not reused:
+                    raise
+            except (OSError, http.client.HTTPException):
+                self.discard(*key)
+                raise
+        raise http.client.RemoteDisconnected(f"Remote end closed connection: {parts.netloc}")
+
+    def release(self, parts: SplitResult, resp: http.client.HTTPResponse) -> None:
+        """Return the connection for reuse; it is dropped if the body was not read to the end."""
+        if not resp.isclosed():
+            self.discard(parts.scheme, parts.netloc)
+
+
+_POOL = _ConnectionPool()
+
+
+class FetchCache:
+    """Conditional-GET cache: `<sha256(url)>.body` plus `.meta.json` holding ETag/Last-Modified."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.body", self.root / f"{key}.meta.json"
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = load_path(meta_path)
+            size = body_path.stat().st_size
+        except (OSError, ValueError):
+            return None
+        # A body without matching meta (interrupted store) is ignored.
+        if not isinstance(meta, dict) or meta.get("size") != size:
+            return None
+        return meta
+
+    def validators(self, meta: Dict[str, Any]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        etag = str(meta.get("etag") or "")
+        if etag:
+            # Entity tags are quoted strings (optionally W/-prefixed); repair servers that send them bare.
+            headers["If-None-Match"] = etag if etag.endswith('"') else f'"{etag}"'
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = str(meta["last_modified"])
+        return headers
+
+    def body(self, url: str) -> bytes:
+        return self._paths(url)[0].read_bytes()
+
+    def discard(self, url: str) -> None:
+        for path in self._paths(url):
+            path.unlink(missing_ok=True)
+
+    def store(self, url: str, result: FetchResult, etag: str, last_modified: str) -> None:
+        body_path, meta_path = self._paths(url)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = body_path.with_name(f"{body_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(result.body)
+            os.replace(tmp, body_path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        write_json_atomic(
+            meta_path,
+            {
+                "url": url,
+                "final_url": result.final_url,
+                "status_code": result.status_code,
+                "content_type": result.content_type,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(result.body),
+            },
+        )
+
+
+# Enabled with SUMMARYREPORT_HTTP_CACHE=1 (stored under tmp/http-cache) or configure_cache().
+_CACHE: Optional[FetchCache] = (
+    FetchCache(Path("tmp/http-cache")) if os.getenv("SUMMARYREPORT_HTTP_CACHE", "0") == "1" else None
+)
+
+
+def configure_cache(root: Optional[Path]) -> None:
+    global _CACHE
+    _CACHE = FetchCache(root) if root is not None else None
+
+
 def _build_headers(use_browser_headers: bool) -> Dict[str, str]:
     headers = {
         "Accept": "*/*",
+        "User-Agent": DEFAULT_USER_AGENT,
     }
     if use_browser_headers:
         headers.update(
@@ -47,38 +213,331 @@ def _build_headers(use_browser_headers: bool) -> Dict[str, str]:
     return headers
 
 
-def _content_type_from_headers(resp: request.addinfourl) -> str:
-    return (resp.headers.get("Content-Type") or "").lower()
+def _uses_urllib(parts: SplitResult) -> bool:
+    # Proxied and non-HTTP URLs keep going through urllib.request, which handles both.
+    if parts.scheme not in ("http", "https"):
+        return True
+    return parts.scheme in request.getproxies() and not request.proxy_bypass(parts.hostname or "")
+
+
+def _read_capped(resp: Any, max_bytes: int, url: str, sink: Optional[BinaryIO] = None) -> bytes:
+    """Read the body in chunks, failing as soon as it is known to exceed max_bytes.
 
+    With `sink`, chunks are written there and only the first SNIFF_BYTES are returned.
+    """
+    length = (resp.headers.get("Content-Length") or "").strip()
+    if length.isdigit() and int(length) > max_bytes:
+        raise FetchError(f"Response too large (>{max_bytes} bytes): {url}")
+    if sink is not None:
+        head = b""
+        size = 0
+        buf = memoryview(bytearray(SINK_CHUNK_BYTES))
+        while True:
+            n = resp.readinto(buf)
+            if not n:
+                return head
+            size += n
+            if size > max_bytes:
+                raise FetchError(f"Response too large (>{max_bytes} bytes): {url}")
+            if len(head) < SNIFF_BYTES:
+                head += bytes(buf[: min(n, SNIFF_BYTES - len(head))])
+            sink.write(buf[:n])
+    buf = bytearray()
+    while True:
+        chunk = resp.read(READ_CHUNK_BYTES)
+        if not chunk:
+            return bytes(buf)
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise FetchError(f"Response too large (>{max_bytes} bytes): {url}")
 
-def fetch_url(url: str, timeout_seconds: int = 30, max_bytes: int = 20 * 1024 * 1024) -> FetchResult:
-    """Fetch URL and retry once with browser headers when blocked."""
-    ssl_context = ssl.create_default_context()
+
+def _fetch_urllib(
+    url: str, headers: Dict[str, str], timeout_seconds: int, max_bytes: int, sink: Optional[BinaryIO] = None
+) -> Tuple[str, int, http.client.HTTPMessage, bytes, float]:
+    """Returns (final_url, status, headers, body, monotonic time the response headers arrived)."""
+    req = request.Request(url, headers=headers)
+    with request.urlopen(req, timeout=timeout_seconds, context=_SSL_CONTEXT) as resp:
+        headers_at = time.monotonic()
+        body = _read_capped(resp, max_bytes, url, sink)
+        return resp.geturl(), getattr(resp, "status", 200), resp.headers, body, headers_at
+
+
+def _fetch_pooled(
+    url: str, headers: Dict[str, str], timeout_seconds: int, max_bytes: int, sink: Optional[BinaryIO] = None
+) -> Tuple[str, int, http.client.HTTPMessage, bytes, float]:
+    """GET over pooled connections, following redirects; non-2xx responses raise HTTPError like urlopen."""
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        resp = _POOL.get(parts, headers, timeout_seconds)
+        headers_at = time.monotonic()
+        try:
+            location = resp.getheader("Location")
+            if resp.status in REDIRECT_STATUS_CODES and location:
+                resp.read()
+                url = urljoin(url, location)
+                continue
+            if not 200 <= resp.status < 300:
+                raise error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO())
+            body = _read_capped(resp, max_bytes, url, sink)
+            return url, resp.status, resp.headers, body, headers_at
+        finally:
+            _POOL.release(parts, resp)
+    raise error.HTTPError(url, resp.status, "Too many redirects", resp.headers, io.BytesIO())
+
+
+def _retry_after_seconds(headers: Optional[http.client.HTTPMessage]) -> Optional[float]:
+    value = (headers.get("Retry-After") or "").strip() if headers is not None else ""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate_limit_reset(value: str) -> Optional[float]:
+    """X-RateLimit-Reset as seconds from now; providers send either a delta or a Unix timestamp."""
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+class _HostGovernor:
+    """Adaptive per-host concurrency: +0.5 slot per fast 2xx, halved on 429/5xx or slow replies.
+
+    Also holds a host back for Retry-After, or until X-RateLimit-Reset once the remaining quota
+    drops below RATE_LIMIT_RESERVE_RATIO.
+    """
+
+    def __init__(self, c_max: int = HOST_CONCURRENCY_MAX, latency_target: float = HOST_LATENCY_TARGET_SECONDS):
+        self.c_max = c_max
+        self.latency_target = latency_target
+        self._cond = threading.Condition()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+
+    def _state(self, host: str, initial: int) -> Dict[str, float]:
+        st = self._hosts.get(host)
+        if st is None:
+            st = self._hosts[host] = {
+                "c": float(max(1, min(initial, self.c_max))),
+                "in_flight": 0,
+                "ewma_latency": 0.0,
+                "blocked_until": 0.0,
+                "last_decrease": 0.0,
+            }
+        return st
+
+    def acquire(self, host: str, initial: int) -> None:
+        with self._cond:
+            st = self._state(host, initial)
+            while True:
+                wait = st["blocked_until"] - time.monotonic()
+                if wait <= 0 and st["in_flight"] < int(st["c"]):
+                    st["in_flight"] += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, host: str) -> None:
+        with self._cond:
+            st = self._hosts[host]
+            st["in_flight"] -= 1
+            self._cond.notify_all()
+
+    def observe(
+        self, host: str, status: int, latency: float, headers: Optional[http.client.HTTPMessage]
+    ) -> None:
+        """Feed one HTTP response (any attempt) back into the host's limit."""
+        with self._cond:
+            st = self._hosts.get(host)
+            if st is None:
+                return  # host not fetched through fetch_many
+            now = time.monotonic()
+            ewma = st["ewma_latency"]
+            st["ewma_latency"] = latency if ewma == 0.0 else 0.3 * latency + 0.7 * ewma
+            if status in BACKOFF_STATUS_CODES or st["ewma_latency"] > self.latency_target:
+                # One decrease per latency interval, so a burst of concurrent 429s halves once.
+                if now - st["last_decrease"] >= max(st["ewma_latency"], 0.1):
+                    st["c"] = max(1.0, st["c"] * 0.5)
+                    st["last_decrease"] = now
+            elif 200 <= status < 300 or status == 304:
+                st["c"] = min(float(self.c_max), st["c"] + 0.5)
+            block = self._block_seconds(status, headers)
+            if block:
+                st["blocked_until"] = max(st["blocked_until"], now + min(block, MAX_HOST_BLOCK_SECONDS))
+            self._cond.notify_all()
+
+    @staticmethod
+    def _block_seconds(status: int, headers: Optional[http.client.HTTPMessage]) -> float:
+        if headers is None:
+            return 0.0
+        if status in BACKOFF_STATUS_CODES:
+            retry_after = _retry_after_seconds(headers)
+            if retry_after:
+                return retry_after
+        try:
+            remaining = float(headers.get("X-RateLimit-Remaining") or "")
+            limit = float(headers.get("X-RateLimit-Limit") or "")
+        except ValueError:
+            return 0.0
+        if limit > 0 and remaining < limit * RATE_LIMIT_RESERVE_RATIO:
+            return _parse_rate_limit_reset(headers.get("X-RateLimit-Reset") or "") or 0.0
+        return 0.0
+
+
+_GOVERNOR = _HostGovernor()
+
+
+def fetch_url(
+    url: str,
+    timeout_seconds: int = 30,
+    max_bytes: int = 20 * 1024 * 1024,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    sink: Optional[BinaryIO] = None,
+) -> FetchResult:
+    """Fetch URL, switching to browser headers once when blocked.
+
+    Transient statuses (BACKOFF_STATUS_CODES) are retried up to `max_retries` attempts with
+    full-jitter exponential backoff; a Retry-After header sets the minimum wait. The browser-header
+    switch does not count as an attempt. With the HTTP cache enabled, a cached body is revalidated
+    with If-None-Match/If-Modified-Since and reused on 304.
+
+    With `sink` (a seekable binary file), the body is streamed into it instead of memory, the file
+    is rewound before each attempt, `body` holds only the first SNIFF_BYTES, and the cache is bypassed.
+    """
     last_error: Optional[Exception] = None
+    parts = urlsplit(url)
+    fetch = _fetch_urllib if _uses_urllib(parts) else _fetch_pooled
+    use_browser_headers = False
+    attempt = 0
+    cache = _CACHE if sink is None else None
+    cached_meta = cache.lookup(url) if cache is not None else None
+    conditional_headers = cache.validators(cached_meta) if cache is not None and cached_meta else {}
 
-    for use_browser_headers in (False, True):
-        req = request.Request(url, headers=_build_headers(use_browser_headers))
+    while attempt < max_retries:
+        if sink is not None:
+            sink.seek(0)
+            sink.truncate()
+        started = time.monotonic()
         try:
-            with request.urlopen(req, timeout=timeout_seconds, context=ssl_context) as resp:
-                body = resp.read(max_bytes + 1)
+            final_url, status_code, headers, body, headers_at = fetch(
+                url,
+                {**_build_headers(use_browser_headers), **conditional_headers},
+                timeout_seconds,
+                max_bytes,
+                sink,
+            )
+            # Time to headers only: body transfer time scales with file size, not server load.
+            _GOVERNOR.observe(parts.netloc, status_code, headers_at - started, headers)
+            result = FetchResult(
+                url=url,
+                final_url=final_url,
+                status_code=status_code,
+                content_type=(headers.get("Content-Type") or "").lower(),
+                body=body,
+                used_browser_headers=use_browser_headers,
+            )
+            etag = headers.get("ETag") or ""
+            last_modified = headers.get("Last-Modified") or ""
+            if cache is not None and (etag or last_modified):
+                try:
+                    cache.store(url, result, etag, last_modified)
+                except OSError:
+                    pass
+            return result
+        except error.HTTPError as exc:
+            last_error = exc
+            _GOVERNOR.observe(parts.netloc, exc.code, time.monotonic() - started, exc.headers)
+            if exc.code == 304 and cache is not None and cached_meta:
+                try:
+                    body = cache.body(url)
+                except OSError:
+                    # Cache entry vanished; fetch unconditionally. Counted as an attempt so a
+                    # server that keeps answering 304 cannot loop forever.
+                    try:
+                        cache.discard(url)
+                    except OSError:
+                        pass
+                    cached_meta = None
+                    conditional_headers = {}
+                    attempt += 1
+                    continue
                 if len(body) > max_bytes:
-                    raise FetchError(f"Response too large (>{max_bytes} bytes): {url}")
-
+                    raise FetchError(f"Response too large (>{max_bytes} bytes): {url}") from exc
                 return FetchResult(
                     url=url,
-                    final_url=resp.geturl(),
-                    status_code=getattr(resp, "status", 200),
-                    content_type=_content_type_from_headers(resp),
+                    final_url=str(cached_meta.get("final_url") or url),
+                    status_code=int(cached_meta.get("status_code") or 200),
+                    content_type=str(cached_meta.get("content_type") or ""),
                     body=body,
                     used_browser_headers=use_browser_headers,
                 )
-        except error.HTTPError as exc:
-            last_error = exc
-            if use_browser_headers or exc.code not in RETRY_STATUS_CODES:
+            if not use_browser_headers and exc.code in RETRY_STATUS_CODES:
+                use_browser_headers = True
+                continue
+            attempt += 1
+            if exc.code not in BACKOFF_STATUS_CODES or attempt >= max_retries:
                 break
-        except (error.URLError, TimeoutError, ssl.SSLError) as exc:
+            delay = random.uniform(0, min(base_delay * 2 ** (attempt - 1), max_delay))
+            retry_after = _retry_after_seconds(exc.headers)
+            if retry_after is not None:
+                if retry_after > max_delay:
+                    break
+                delay = max(delay, retry_after)
+            time.sleep(delay)
+        except (error.URLError, OSError, http.client.HTTPException) as exc:
             last_error = exc
             if use_browser_headers:
                 break
+            use_browser_headers = True
 
     raise FetchError(f"Failed to fetch URL: {url} ({last_error})")
+
+
+def fetch_many(
+    urls: List[str],
+    max_workers: int = 8,
+    per_host: int = 4,
+    sinks: Optional[List[BinaryIO]] = None,
+    **kwargs: Any,
+) -> List[Union[FetchResult, Exception]]:
+    """fetch_url over a thread pool with an adaptive per-host limit starting at `per_host`.
+
+    The limit grows towards HOST_CONCURRENCY_MAX while the host answers quickly and is halved
+    on 429/5xx or slow responses (see _HostGovernor). `sinks`, one per URL, streams each body
+    to its own file as with fetch_url(sink=...).
+
+    Returns one entry per URL in input order: the FetchResult, or the exception that URL raised.
+    """
+    results: List[Union[FetchResult, Exception]] = [FetchError("not fetched")] * len(urls)
+    if not urls:
+        return results
+
+    def _fetch(url: str, sink: Optional[BinaryIO]) -> FetchResult:
+        host = urlsplit(url).netloc
+        _GOVERNOR.acquire(host, per_host)
+        try:
+            return fetch_url(url, sink=sink, **kwargs)
+        finally:
+            _GOVERNOR.release(host)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as pool:
+        futures = {
+            pool.submit(_fetch, url, sinks[i] if sinks is not None else None): i for i, url in enumerate(urls)
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exc:  # reported per URL so one failure does not stop the batch
+                results[futures[future]] = exc
+    return results
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Shared JSON serialization helpers (uses orjson when installed)."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def read_bytes(path: Path) -> bytes:
+    if not path.exists():
+        return b""
+    return path.read_bytes()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON bytes/str; invalid UTF-8 is decoded with errors="replace" like the text readers."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+    return json.loads(data)
+
+
+def load_path(path: Path) -> Any:
+    """Parse a JSON file (memory-mapped when orjson is available); returns None if missing or empty."""
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        if orjson is not None:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                try:
+                    return orjson.loads(view)
+                except orjson.JSONDecodeError:
+                    pass
+            f.seek(0)
+        return loads(f.read())
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """Serialize obj as indented UTF-8 JSON, matching json.dumps(indent=2, ensure_ascii=False)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """Serialize obj as compact UTF-8 JSON; unencodable strings (lone surrogates) are replaced."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8", errors="replace")
+
+
+def write_json(path: Path, obj: Any) -> None:
+    path.write_bytes(dumps_pretty(obj))
+
+
+def write_json_atomic(path: Path, obj: Any) -> None:
+    """Write via a sibling temp file and os.replace so readers never see a partial file."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(dumps_pretty(obj))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _indent(data: bytes, prefix: bytes) -> bytes:
+    # JSON output never contains raw newlines inside strings, so this only shifts structure lines.
+    return data.replace(b"\n", b"\n" + prefix)
+
+
+def write_json_records(path: Path, head: dict[str, Any], key: str, records: Iterable[Any]) -> None:
+    """Write `{**head, key: [*records]}` one record at a time; output matches write_json."""
+    with path.open("wb") as f:
+        f.write(b"{\n")
+        for k, v in head.items():
+            f.write(b"  " + dumps_pretty(str(k)) + b": " + _indent(dumps_pretty(v), b"  ") + b",\n")
+        f.write(b"  " + dumps_pretty(key) + b": [")
+        first = True
+        for rec in records:
+            f.write(b"\n    " if first else b",\n    ")
+            f.write(_indent(dumps_pretty(rec), b"    "))
+            first = False
+        f.write(b"]\n}" if first else b"\n  ]\n}")
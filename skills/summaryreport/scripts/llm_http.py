@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Keep-alive HTTP client for OpenAI-compatible endpoints (one connection per thread)."""
+
+from __future__ import annotations
+
+import http.client
+import threading
+from urllib import error, request as urllib_request
+from urllib.parse import urlsplit
+
+
+class KeepAliveClient:
+    """Send requests over a persistent per-thread connection so TLS setup is paid once per thread.
+
+    When HTTP(S)_PROXY applies to the base URL (and NO_PROXY does not exclude it), requests go
+    through urllib.request instead, which handles the proxy; those are not kept alive.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        parts = urlsplit(base_url)
+        self._base_url = base_url.rstrip("/")
+        self._proxied = parts.scheme in urllib_request.getproxies() and not urllib_request.proxy_bypass(
+            parts.hostname or ""
+        )
+        self._conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._path_prefix = parts.path.rstrip("/")
+        self._local = threading.local()
+
+    def _connection(self, timeout: float) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._conn_cls(self._netloc, timeout=timeout)
+            self._local.conn = conn
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _reusing(self) -> bool:
+        conn = getattr(self._local, "conn", None)
+        return conn is not None and conn.sock is not None
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _request_once(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str], timeout: float
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        conn = self._connection(timeout)
+        try:
+            conn.request(method, self._path_prefix + path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if resp.will_close:
+            self.close()
+        return resp.status, resp.headers, raw
+
+    def _request_urllib(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str], timeout: float
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        req = urllib_request.Request(self._base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urllib_request.urlopen(req, timeout=timeout) as resp:
+                return resp.status, resp.headers, resp.read()
+        except error.HTTPError as exc:
+            # Same contract as the direct path: HTTP errors come back as a status, not an exception.
+            with exc:
+                return exc.code, exc.headers, exc.read()
+
+    def request(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str], timeout: float
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """Send to `path` under the base URL; reconnects once if the server closed a reused connection."""
+        if self._proxied:
+            return self._request_urllib(method, path, body, headers, timeout)
+        reused = self._reusing()
+        try:
+            return self._request_once(method, path, body, headers, timeout)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # A fresh connection failing this way is a real error; do not send the request twice.
+            if not reused:
+                raise
+            return self._request_once(method, path, body, headers, timeout)
+
+    def post(
+        self, path: str, body: bytes, headers: dict[str, str], timeout: float
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        return self.request("POST", path, body, headers, timeout)
+
+    def get(self, path: str, headers: dict[str, str], timeout: float) -> tuple[int, http.client.HTTPMessage, bytes]:
+        return self.request("GET", path, None, headers, timeout)
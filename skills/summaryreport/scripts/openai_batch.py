@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""OpenAI Batch API helper: upload JSONL requests, wait for the batch, collect per-request responses."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+from uuid import uuid4
+
+from json_io import dumps_compact, loads
+from llm_http import KeepAliveClient
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+REQUEST_TIMEOUT_SEC = 180
+
+
+class BatchError(RuntimeError):
+    """Raised when a batch cannot be created, finishes unsuccessfully, or times out."""
+
+
+def request_line(custom_id: str, url: str, req_body: bytes) -> bytes:
+    """One JSONL input line; `req_body` is the already-serialized request JSON, spliced in unchanged."""
+    return (
+        b'{"custom_id":' + dumps_compact(custom_id)
+        + b',"method":"POST","url":' + dumps_compact(url)
+        + b',"body":' + req_body + b"}"
+    )
+
+
+def _multipart(fields: dict[str, str], filename: str, content: bytes) -> tuple[bytes, str]:
+    boundary = f"----summaryreport{uuid4().hex}"
+    parts: list[bytes] = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    parts.append(
+        (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: application/jsonl\r\n\r\n"
+        ).encode("utf-8")
+        + content
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _checked(status: int, raw: bytes, what: str) -> Any:
+    if status >= 400:
+        raise BatchError(f"{what} failed: {status} {raw.decode('utf-8', errors='replace')}")
+    return loads(raw)
+
+
+def _error_message(row: dict[str, Any]) -> str:
+    resp = row.get("response") or {}
+    err = row.get("error") or (resp.get("body") or {}).get("error") or {}
+    message = str(err.get("message") or err) if isinstance(err, dict) else str(err)
+    status = resp.get("status_code")
+    return f"{status}: {message}" if status else message
+
+
+def _read_results(
+    client: KeepAliveClient,
+    headers: dict[str, str],
+    file_id: str,
+    responses: dict[str, dict[str, Any]],
+    errors: dict[str, str],
+) -> None:
+    """Sort one output or error file's rows into `responses` (bodies) and `errors` (messages) by custom_id."""
+    status, _, raw = client.get(f"/files/{file_id}/content", headers, REQUEST_TIMEOUT_SEC)
+    if status >= 400:
+        raise BatchError(f"batch result download failed: {status}")
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        row = loads(line)
+        custom_id = str(row.get("custom_id", ""))
+        resp = row.get("response") or {}
+        body = resp.get("body")
+        if row.get("error") or int(resp.get("status_code") or 0) >= 400 or not isinstance(body, dict):
+            errors[custom_id] = _error_message(row) or "no response body"
+            continue
+        responses[custom_id] = body
+
+
+def run_batch(
+    client: KeepAliveClient,
+    api_key: str,
+    lines: list[bytes],
+    endpoint: str = "/v1/chat/completions",
+    completion_window: str = "24h",
+    poll_seconds: float = 30.0,
+    max_wait_seconds: float = 3600.0,
+) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+    """Run `lines` (see request_line) as one batch; return (response bodies, error messages) by custom_id.
+
+    Failed requests are reported in the second dict (from the batch's error file), so callers can
+    retry them another way. A batch still running after `max_wait_seconds` is cancelled and raises
+    BatchError.
+    """
+    auth = {"Authorization": f"Bearer {api_key}"}
+    body, content_type = _multipart({"purpose": "batch"}, "requests.jsonl", b"\n".join(lines) + b"\n")
+    status, _, raw = client.post("/files", body, {**auth, "Content-Type": content_type}, REQUEST_TIMEOUT_SEC)
+    input_file_id = _checked(status, raw, "batch input upload")["id"]
+
+    create = dumps_compact(
+        {"input_file_id": input_file_id, "endpoint": endpoint, "completion_window": completion_window}
+    )
+    status, _, raw = client.post("/batches", create, {**auth, "Content-Type": "application/json"}, REQUEST_TIMEOUT_SEC)
+    batch = _checked(status, raw, "batch creation")
+
+    deadline = time.monotonic() + max_wait_seconds
+    while batch.get("status") not in TERMINAL_STATUSES:
+        if time.monotonic() >= deadline:
+            client.post(f"/batches/{batch['id']}/cancel", b"", auth, REQUEST_TIMEOUT_SEC)
+            raise BatchError(f"batch {batch['id']} did not finish within {max_wait_seconds:.0f}s")
+        time.sleep(poll_seconds)
+        status, _, raw = client.get(f"/batches/{batch['id']}", auth, REQUEST_TIMEOUT_SEC)
+        batch = _checked(status, raw, "batch status")
+
+    output_file_id: Optional[str] = batch.get("output_file_id")
+    error_file_id: Optional[str] = batch.get("error_file_id")
+    if batch.get("status") != "completed" and not (output_file_id or error_file_id):
+        details = "; ".join(
+            str(e.get("message", "")) for e in ((batch.get("errors") or {}).get("data") or []) if isinstance(e, dict)
+        )
+        raise BatchError(f"batch {batch['id']} ended as {batch.get('status')}" + (f": {details}" if details else ""))
+    responses: dict[str, dict[str, Any]] = {}
+    errors: dict[str, str] = {}
+    for file_id in (output_file_id, error_file_id):
+        if file_id:
+            _read_results(client, auth, file_id, responses, errors)
+    return responses, errors
@@ -4,12 +4,22 @@
 from __future__ import annotations
 
 import argparse
+import http.client
+import json
+import os
+import socket
 import subprocess
+from typing import Optional
+from urllib.parse import quote
 
 DEFAULT_CONTAINER_NAME = "docling-server"
 DEFAULT_IMAGE = "quay.io/docling-project/docling-serve:latest"
 DEFAULT_HOST_PORT = "5001"
 DEFAULT_CONTAINER_PORT = "5001"
+# States listed by plain `docker ps` (without -a).
+RUNNING_STATES = {"running", "paused", "restarting"}
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+DOCKER_API_TIMEOUT_SECONDS = 5
 
 
 class InitError(RuntimeError):
@@ -23,14 +33,72 @@ def _run(cmd: list[str]) -> str:
     return proc.stdout.strip()
 
 
-def _container_exists(name: str) -> bool:
-    out = _run(["docker", "ps", "-a", "--filter", f"name=^{name}$", "--format", "{{.Names}}"])
-    return out.strip() == name
-
-
-def _container_running(name: str) -> bool:
-    out = _run(["docker", "ps", "--filter", f"name=^{name}$", "--format", "{{.Names}}"])
-    return out.strip() == name
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def _docker_socket_path() -> Optional[str]:
+    """Return the Engine API socket path, or None when DOCKER_HOST points elsewhere (tcp://, ssh://, npipe)."""
+    host = os.environ.get("DOCKER_HOST", "")
+    if not host:
+        return DEFAULT_DOCKER_SOCKET
+    if host.startswith("unix://"):
+        return host[len("unix://") :]
+    return None
+
+
+def _docker_get(path: str) -> tuple[int, bytes]:
+    socket_path = _docker_socket_path()
+    if socket_path is None:
+        raise OSError("docker engine socket is not local")
+    conn = _UnixHTTPConnection(socket_path, DOCKER_API_TIMEOUT_SECONDS)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    finally:
+        conn.close()
+
+
+def _container_state_api(name: str) -> Optional[str]:
+    status, body = _docker_get(f"/containers/{quote(name, safe='')}/json")
+    if status == 404:
+        return None
+    if status != 200:
+        raise OSError(f"docker engine API returned HTTP {status}")
+    data = json.loads(body)
+    state = data.get("State") if isinstance(data, dict) else None
+    if not isinstance(state, dict):
+        # Unexpected payload shape: let _container_state fall back to the CLI.
+        raise ValueError("docker engine API returned no container State object")
+    return str(state.get("Status", "")).lower() or ("running" if state.get("Running") else "exited")
+
+
+def _container_state(name: str) -> Optional[str]:
+    """Return the container state (e.g. "running", "exited"), or None if it does not exist."""
+    # Ask the Engine API over its Unix socket first; the CLI is the fallback for remote engines.
+    try:
+        return _container_state_api(name)
+    except (OSError, http.client.HTTPException, ValueError):
+        pass
+    out = _run(["docker", "ps", "-a", "--filter", f"name=^{name}$", "--format", "{{.Names}}\t{{.State}}"])
+    for line in out.splitlines():
+        found, _, state = line.partition("\t")
+        if found.strip() == name:
+            return state.strip().lower()
+    return None
 
 
 def main() -> int:
@@ -41,11 +109,13 @@ def main() -> int:
     parser.add_argument("--container-port", default=DEFAULT_CONTAINER_PORT)
     args = parser.parse_args()
 
-    if _container_running(args.container_name):
+    # One state lookup answers both "running?" and "exists?".
+    state = _container_state(args.container_name)
+    if state in RUNNING_STATES:
         print(f"already-running:{args.container_name}")
         return 0
 
-    if _container_exists(args.container_name):
+    if state is not None:
         _run(["docker", "start", args.container_name])
         print(f"started-existing:{args.container_name}")
         return 0
@@ -5,9 +5,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from json_io import load_path, write_json_atomic
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_INVALID_FILENAME_CHARS_RE = re.compile(r"[\\/:*?\"<>|]")
+_TITLE_DATE_SUFFIX_RE = re.compile(r"^(.*?)(?:_(\d{8}))?$")
+_ABSTRACT_FENCE_RE = re.compile(r"## 要約（Abstract）\n```[\s\S]*?```")
 
 
 def _string_value(value: Any) -> str:
@@ -23,11 +31,8 @@ def _read_text(path: Path) -> str:
 
 
 def _read_json(path: Path) -> dict[str, Any]:
-    raw = _read_text(path)
-    if not raw:
-        return {}
     try:
-        obj = json.loads(raw)
+        obj = load_path(path)
     except json.JSONDecodeError:
         return {}
     if not isinstance(obj, dict):
@@ -45,8 +50,8 @@ def _ensure_step9_completed(step9: dict[str, Any], step9_path: Path) -> None:
 
 
 def _safe_filename_part(text: str) -> str:
-    s = re.sub(r"\s+", "", (text or "").strip())
-    s = re.sub(r"[\\/:*?\"<>|]", "_", s)
+    s = _WHITESPACE_RE.sub("", (text or "").strip())
+    s = _INVALID_FILENAME_CHARS_RE.sub("_", s)
     s = s.strip("._")
     return s or "report"
 
@@ -69,7 +74,7 @@ def _focused_report_title(step2: dict[str, Any], step8: dict[str, Any]) -> str:
     if report_title:
         if "総理発言" in report_title:
             return report_title
-        m = re.match(r"^(.*?)(?:_(\d{8}))?$", report_title)
+        m = _TITLE_DATE_SUFFIX_RE.match(report_title)
         if m:
             base = _string_value(m.group(1))
             date = _string_value(m.group(2))
@@ -129,17 +134,18 @@ def _build_page_overview(step2: dict[str, Any], step9: dict[str, Any]) -> str:
     return "\n".join(lines).strip()
 
 
-def _build_material_details(step8: dict[str, Any], step2: dict[str, Any]) -> str:
+def _iter_material_details(step8: dict[str, Any], step2: dict[str, Any]) -> Iterator[str]:
+    """Yield one markdown block per document; blocks are joined with a blank line."""
     docs = step8.get("per_document", [])
     if not isinstance(docs, list) or not docs:
-        return "（資料サマリーなし）"
+        yield "（資料サマリーなし）"
+        return
 
     mode = _string_value(step2.get("mode", "")).lower()
     preferred_title = _string_value(step2.get("meeting_name", {}).get("value", "")) or _string_value(
         step2.get("report_title", "")
     )
 
-    parts: list[str] = []
     for i, d in enumerate(docs, start=1):
         if not isinstance(d, dict):
             continue
@@ -153,7 +159,7 @@ def _build_material_details(step8: dict[str, Any], step2: dict[str, Any]) -> str
         if not isinstance(points, list):
             points = []
 
-        parts.append(f"### {i}. {title}")
+        parts: list[str] = [f"### {i}. {title}"]
         if url:
             parts.append(f"- URL: {url}")
         if doc_type:
@@ -167,44 +173,29 @@ def _build_material_details(step8: dict[str, Any], step2: dict[str, Any]) -> str
                 if not isinstance(p, str) or not p.strip():
                     continue
                 parts.append(f"  - {p.strip()}")
-        parts.append("")
+        yield "\n".join(parts)
 
-    return "\n".join(parts).strip()
 
-
-def _build_report_md(step2: dict[str, Any], step9: dict[str, Any], step8: dict[str, Any]) -> str:
+def _iter_report_md(step2: dict[str, Any], step9: dict[str, Any], step8: dict[str, Any]) -> Iterator[str]:
+    """Yield the report markdown in chunks, each ending with a newline."""
     title = _focused_report_title(step2, step8)
     abstract = _string_value(step9.get("abstract_ja", ""))
     overall = _string_value(step9.get("overall_summary_ja", ""))
     url = _string_value(step9.get("source_url", "")) or _string_value(step2.get("url", ""))
     page_overview = _build_page_overview(step2, step9)
-    details = _build_material_details(step8, step2)
     detail_heading = "### 総理発言サマリー" if _contains_prime_minister_remarks(step8) else "### 資料別サマリー"
 
-    lines: list[str] = []
-    lines.append(f"# {title}")
-    lines.append("")
-    lines.append("## ページの概要")
-    lines.append(page_overview or "（概要情報なし）")
-    lines.append("")
-    lines.append("## 要約（Abstract）")
-    lines.append("```")
-    lines.append(abstract)
-    if url:
-        lines.append(url)
-    lines.append("```")
-    lines.append("")
-    lines.append("## ページの詳細サマリー")
-    lines.append(overall or "（詳細サマリーなし）")
-    lines.append("")
-    lines.append(detail_heading)
-    lines.append(details)
-    lines.append("")
-    return "\n".join(lines).strip() + "\n"
+    yield f"# {title}\n\n## ページの概要\n{page_overview or '（概要情報なし）'}\n\n"
+    yield "## 要約（Abstract）\n```\n" + abstract + "\n" + (url + "\n" if url else "") + "```\n\n"
+    yield f"## ページの詳細サマリー\n{overall or '（詳細サマリーなし）'}\n\n{detail_heading}\n"
+    first = True
+    for block in _iter_material_details(step8, step2):
+        yield block + "\n" if first else "\n" + block + "\n"
+        first = False
 
 
 def _validate_report(md: str, source_url: str) -> dict[str, Any]:
-    has_fence = "## 要約（Abstract）" in md and re.search(r"## 要約（Abstract）\n```[\s\S]*?```", md) is not None
+    has_fence = "## 要約（Abstract）" in md and _ABSTRACT_FENCE_RE.search(md) is not None
     has_url = bool(source_url and source_url in md)
     return {"has_abstract_code_fence": has_fence, "has_source_url_in_report": has_url}
 
@@ -235,18 +226,33 @@ def main() -> int:
     out_path = Path(args.output_file) if args.output_file else _derive_output_path(step2, step8)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    md = _build_report_md(step2, step9, step8)
-    out_path.write_text(md, encoding="utf-8")
-
     source_url = _string_value(step9.get("source_url", "")) or _string_value(step2.get("url", ""))
-    validation = _validate_report(md, source_url)
+    validation = {"has_abstract_code_fence": False, "has_source_url_in_report": False}
+    size_bytes = 0
+    # Write to a sibling temp file and rename so an interrupted run never leaves a truncated report.
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            for chunk in _iter_report_md(step2, step9, step8):
+                data = chunk.encode("utf-8")
+                f.write(data)
+                size_bytes += len(data)
+                # The abstract fence is emitted as one chunk and URLs never span a newline, so per-chunk
+                # checks give the same result as validating the whole file.
+                for key, ok in _validate_report(chunk, source_url).items():
+                    validation[key] = validation[key] or ok
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
     meta = {
         "run_id": args.run_id,
         "output_file": str(out_path),
-        "size_bytes": out_path.stat().st_size,
+        "size_bytes": size_bytes,
         "validation": validation,
     }
-    (run_dir / "step10-output.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json_atomic(run_dir / "step10-output.json", meta)
     print(str(out_path))
     return 0
 
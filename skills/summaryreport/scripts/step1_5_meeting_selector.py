@@ -10,10 +10,26 @@ import re
 from pathlib import Path
 from typing import Any
 from urllib import error, request
-from urllib.parse import urljoin
+from urllib.parse import unquote, urljoin, urlsplit
+
+from json_io import dumps_compact, dumps_pretty, load_path, loads, write_json
 
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP1_5_MODEL", "gpt-5-mini")
+# source.md sent to the LLM is cut to this many chars around the first target match; 0 sends it whole.
+SOURCE_WINDOW_CHARS = int(os.getenv("SUMMARYREPORT_STEP1_5_SOURCE_WINDOW_CHARS", "40000"))
+SOURCE_WINDOW_LEAD_CHARS = 5000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Markdown links whose target mentions ".pdf"; other links never produce a match object.
+_PDF_LINK_RE = re.compile(r"\[[^\]]+\]\(([^)]*\.pdf[^)]*)\)", re.IGNORECASE)
+# Targets of all Markdown links, for exact URL matching.
+_LINK_TARGET_RE = re.compile(r"\]\(([^)\s]+)\)")
+_H1_HEADING_RE = re.compile(r"^#\s+.+$", re.MULTILINE)
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$", re.MULTILINE)
+_FENCE_LINE_RE = re.compile(r"^[^\S\n]*---[^\S\n]*$", re.MULTILINE)
+# Line boundaries str.splitlines() honours besides "\n".
+_OTHER_LINE_BREAKS_RE = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 def _read_text(path: Path) -> str:
@@ -28,11 +44,8 @@ def _write_text(path: Path, text: str) -> None:
 
 
 def _read_json_list(path: Path) -> list[dict[str, Any]]:
-    raw = _read_text(path)
-    if not raw:
-        return []
     try:
-        data = json.loads(raw)
+        data = load_path(path)
     except json.JSONDecodeError:
         return []
     if not isinstance(data, list):
@@ -45,10 +58,21 @@ def _read_json_list(path: Path) -> list[dict[str, Any]]:
 
 
 def _normalize(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WHITESPACE_RE.sub(" ", (s or "").strip())
 
 
 def _extract_frontmatter(md_text: str) -> tuple[str, str]:
+    if not _OTHER_LINE_BREAKS_RE.search(md_text):
+        # "\n"-only text: locate the fences with string searches instead of splitting every line.
+        nl = md_text.find("\n")
+        if nl < 0 or md_text[:nl].strip() != "---":
+            return "", md_text
+        m = _FENCE_LINE_RE.search(md_text, nl + 1)
+        if m is None:
+            return "", md_text
+        rest = md_text[m.end() + 1 :]
+        body = (rest[:-1] if rest.endswith("\n") else rest).lstrip("\n")
+        return md_text[: m.end()].strip() + "\n\n", body
     lines = md_text.splitlines()
     if not lines or lines[0].strip() != "---":
         return "", md_text
@@ -60,6 +84,71 @@ def _extract_frontmatter(md_text: str) -> tuple[str, str]:
     return "", md_text
 
 
+def _window_around_target(md: str, target: dict[str, str], window_chars: int) -> tuple[str, int, int]:
+    """Return (window, start, end): `window_chars` from shortly before the line matching the target.
+
+    The most specific value anchors the window (round, then date, then meeting name), since the
+    name alone usually first appears in a page-wide heading. Without any match, the whole text is sent.
+    """
+    if window_chars <= 0 or len(md) <= window_chars:
+        return md, 0, len(md)
+    for needle in (target["round"], target["date"], target["meeting_name"]):
+        if not needle:
+            continue
+        m = re.search(re.escape(needle), md, flags=re.IGNORECASE)
+        if m:
+            line_start = md.rfind("\n", 0, m.start()) + 1
+            start = max(0, line_start - SOURCE_WINDOW_LEAD_CHARS)
+            end = min(len(md), start + window_chars)
+            return md[start:end], start, end
+    return md, 0, len(md)
+
+
+def _try_deterministic_select(
+    md: str, links: list[dict[str, str]], target: dict[str, str]
+) -> dict[str, Any] | None:
+    """Select without the LLM when exactly one #/## heading names the target meeting (and round).
+
+    Returns an LLM-shaped result, or None when the choice is not unambiguous. Dates are written in
+    too many forms to match against headings, so a target date always goes to the LLM.
+    """
+    if not target["meeting_name"] or target["text"] or target["date"]:
+        return None
+    needles = [v.casefold() for v in (target["meeting_name"], target["round"]) if v]
+    headings = list(_HEADING_RE.finditer(md))
+    matches = [
+        i
+        for i, h in enumerate(headings)
+        if len(h.group(1)) <= 2 and all(n in _normalize(h.group(2)).casefold() for n in needles)
+    ]
+    if len(matches) != 1:
+        return None
+    i = matches[0]
+    level = len(headings[i].group(1))
+    j = next((j for j in range(i + 1, len(headings)) if len(headings[j].group(1)) <= level), len(headings))
+    # Sub-headings naming the meeting again (one per session) mean the heading is a page-wide title.
+    meeting = needles[0]
+    if any(meeting in _normalize(h.group(2)).casefold() for h in headings[i + 1 : j]):
+        return None
+    end = headings[j].start() if j < len(headings) else len(md)
+    section = md[headings[i].start() : end].strip()
+
+    # Anchor texts like "資料1" repeat across meetings, so only the URL or its file name counts.
+    # Step1 writes absolute link targets, so an exact URL match wins; a bare file name must end a
+    # link target ("/1.pdf)" but not "/11.pdf)") and is only tried when no URL matched.
+    targets = set(_LINK_TARGET_RE.findall(section))
+    urls = [x["url"] for x in links if x["url"] and x["url"] in targets]
+    if not urls:
+        for x in links:
+            url = x["url"]
+            name = x["filename"] or unquote(urlsplit(url).path.rsplit("/", 1)[-1])
+            if url and name and re.search(rf"[/(]{re.escape(name)}\)", section):
+                urls.append(url)
+    if not urls:
+        return None
+    return {"selected_markdown": section, "selected_pdf_urls": urls, "confidence": 1.0, "reason": "deterministic"}
+
+
 def _parse_pdf_links_fallback_txt(path: Path) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
     for ln in _read_text(path).splitlines():
@@ -74,6 +163,18 @@ def _parse_pdf_links_fallback_txt(path: Path) -> list[dict[str, Any]]:
     return out
 
 
+def _normalized_links(links: list[dict[str, Any]]) -> list[dict[str, str]]:
+    """Normalize each link's text/url/filename once; the LLM payload and URL matching share the result."""
+    return [
+        {
+            "text": _normalize(str(x.get("text", ""))),
+            "url": _normalize(str(x.get("url", ""))),
+            "filename": _normalize(str(x.get("filename", ""))),
+        }
+        for x in links
+    ]
+
+
 def _schema() -> dict[str, Any]:
     return {
         "type": "object",
@@ -88,7 +189,8 @@ def _schema() -> dict[str, Any]:
     }
 
 
-def _call_llm(source_md: str, links: list[dict[str, Any]], target: dict[str, str]) -> dict[str, Any]:
+def _call_llm(source_md: str, links: list[dict[str, str]], target: dict[str, str]) -> dict[str, Any]:
+    """`links` are the _normalized_links() rows."""
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
@@ -103,14 +205,7 @@ def _call_llm(source_md: str, links: list[dict[str, Any]], target: dict[str, str
     user_payload = {
         "target": target,
         "source_markdown": source_md,
-        "pdf_links": [
-            {
-                "text": _normalize(str(x.get("text", ""))),
-                "url": _normalize(str(x.get("url", ""))),
-                "filename": _normalize(str(x.get("filename", ""))),
-            }
-            for x in links
-        ],
+        "pdf_links": links,
         "output_requirements": {
             "selected_markdown": "Target scope only. Include target heading and directly related lines/links.",
             "selected_pdf_urls": "PDF URLs related to selected_markdown only.",
@@ -131,7 +226,7 @@ def _call_llm(source_md: str, links: list[dict[str, Any]], target: dict[str, str
 
     req = request.Request(
         f"{OPENAI_API_BASE}/chat/completions",
-        data=json.dumps(body).encode("utf-8"),
+        data=dumps_compact(body),
         method="POST",
         headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
     )
@@ -144,27 +239,20 @@ def _call_llm(source_md: str, links: list[dict[str, Any]], target: dict[str, str
     except error.URLError as exc:
         raise RuntimeError(f"LLM request failed: {exc}") from exc
 
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    return json.loads(data["choices"][0]["message"]["content"])
+    # Parse the wrapper straight from bytes; the message content is parsed from its str as-is.
+    data = loads(raw)
+    return loads(data["choices"][0]["message"]["content"])
 
 
 def _extract_md_links(md_text: str, base_url: str) -> list[str]:
+    seen: set[str] = set()
     out: list[str] = []
-    for m in re.finditer(r"\[[^\]]+\]\(([^)]+)\)", md_text):
-        href = _normalize(m.group(1))
-        if not href:
-            continue
-        u = urljoin(base_url, href)
-        if ".pdf" in u.lower():
+    for m in _PDF_LINK_RE.finditer(md_text):
+        u = urljoin(base_url, _normalize(m.group(1)))
+        if u not in seen and ".pdf" in u.lower():
+            seen.add(u)
             out.append(u)
-    seen = set()
-    uniq: list[str] = []
-    for u in out:
-        if u in seen:
-            continue
-        seen.add(u)
-        uniq.append(u)
-    return uniq
+    return out
 
 
 def _render_links_txt(rows: list[dict[str, Any]]) -> str:
@@ -220,40 +308,47 @@ def main() -> int:
     if not all_links:
         all_links = _parse_pdf_links_fallback_txt(links_txt_path)
 
-    meta_raw = _read_text(meta_path)
     base_url = ""
-    if meta_raw:
-        try:
-            obj = json.loads(meta_raw)
-            if isinstance(obj, dict):
-                base_url = str(obj.get("final_url", "") or obj.get("input_url", ""))
-        except json.JSONDecodeError:
-            pass
+    try:
+        obj = load_path(meta_path)
+        if isinstance(obj, dict):
+            base_url = str(obj.get("final_url", "") or obj.get("input_url", ""))
+    except json.JSONDecodeError:
+        pass
 
     if not any(target.values()):
         _write_text(out_md_path, source_md)
-        _write_text(out_links_json_path, json.dumps(all_links, ensure_ascii=False, indent=2) + "\n")
+        out_links_json_path.write_bytes(dumps_pretty(all_links) + b"\n")
         _write_text(out_links_txt_path, _render_links_txt(all_links))
-        out_meta_path.write_text(
-            json.dumps(
-                {
-                    "run_id": args.run_id,
-                    "applied": False,
-                    "reason": "no target specified",
-                    "selected_md_file": str(out_md_path),
-                    "selected_pdf_links_json_file": str(out_links_json_path),
-                    "selected_pdf_links_file": str(out_links_txt_path),
-                },
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
+        write_json(
+            out_meta_path,
+            {
+                "run_id": args.run_id,
+                "applied": False,
+                "reason": "no target specified",
+                "selected_md_file": str(out_md_path),
+                "selected_pdf_links_json_file": str(out_links_json_path),
+                "selected_pdf_links_file": str(out_links_txt_path),
+            },
         )
         print(str(out_meta_path))
         return 0
 
     frontmatter, body = _extract_frontmatter(source_md)
-    llm = _call_llm(body, all_links, target)
+    normalized_links = _normalized_links(all_links)
+    llm = _try_deterministic_select(body, normalized_links, target)
+    method = "deterministic" if llm is not None else "llm"
+    # Only the LLM path sees a window of the source, so only it records one.
+    source_window: dict[str, Any] | None = None
+    if llm is None:
+        window, window_start, window_end = _window_around_target(body, target, SOURCE_WINDOW_CHARS)
+        source_window = {
+            "truncated": window_end - window_start < len(body),
+            "start_char": window_start,
+            "end_char": window_end,
+            "total_chars": len(body),
+        }
+        llm = _call_llm(window, normalized_links, target)
 
     confidence = float(llm.get("confidence", 0.0))
     selected_body = str(llm.get("selected_markdown", "")).strip()
@@ -264,7 +359,7 @@ def main() -> int:
             f"step1.5 low confidence: {confidence:.3f} < {args.min_confidence:.3f}; reason={llm.get('reason','')}"
         )
 
-    if target["meeting_name"] and not re.search(r"^#\s+.+$", selected_body, flags=re.MULTILINE):
+    if target["meeting_name"] and not _H1_HEADING_RE.search(selected_body):
         selected_body = f"# {target['meeting_name']}\n\n{selected_body}"
 
     selected_md = (frontmatter + selected_body + "\n").strip() + "\n"
@@ -275,33 +370,40 @@ def main() -> int:
     if not selected_urls:
         selected_urls = _extract_md_links(selected_body, base_url)
 
-    urlset = set(selected_urls)
-    selected_links = [x for x in all_links if _normalize(str(x.get("url", ""))) in urlset]
+    # Hash join in selected_urls order (the LLM's ranking); every link row sharing a URL is kept.
+    url_index: dict[str, list[dict[str, Any]]] = {}
+    for x, n in zip(all_links, normalized_links, strict=True):
+        url_index.setdefault(n["url"], []).append(x)
+    selected_links = [x for u in dict.fromkeys(selected_urls) for x in url_index.get(u, ())]
     if not selected_links:
         raise SystemExit("step1.5 failed: no scoped pdf links selected")
 
-    _write_text(out_links_json_path, json.dumps(selected_links, ensure_ascii=False, indent=2) + "\n")
+    out_links_json_path.write_bytes(dumps_pretty(selected_links) + b"\n")
     _write_text(out_links_txt_path, _render_links_txt(selected_links))
 
+    section_selection: dict[str, Any] = {
+        "confidence": confidence,
+        "llm_reason": str(llm.get("reason", "")),
+        "min_confidence": args.min_confidence,
+        "method": method,
+    }
+    if source_window is not None:
+        section_selection["source_window"] = source_window
     result = {
         "run_id": args.run_id,
         "applied": True,
         "target": target,
-        "section_selection": {
-            "confidence": confidence,
-            "llm_reason": str(llm.get("reason", "")),
-            "min_confidence": args.min_confidence,
-        },
+        "section_selection": section_selection,
         "link_selection": {
             "selected_count": len(selected_links),
             "total_count": len(all_links),
-            "method": "llm",
+            "method": method,
         },
         "selected_md_file": str(out_md_path),
         "selected_pdf_links_json_file": str(out_links_json_path),
         "selected_pdf_links_file": str(out_links_txt_path),
     }
-    out_meta_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(out_meta_path, result)
     print(str(out_meta_path))
     return 0
 
@@ -6,11 +6,24 @@ from __future__ import annotations
 import argparse
 import json
 from datetime import datetime, timezone
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from bs4 import BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Text inside these is not page text (matching BeautifulSoup get_text()).
+_NON_TEXT_PARENTS = {"script", "style", "template"}
+# Elements BeautifulSoup closes immediately (never parents of text).
+_VOID_ELEMENTS = {
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+}
 
 
 def make_run_id() -> str:
@@ -19,21 +32,154 @@ def make_run_id() -> str:
     return f"{ts}_{suffix}"
 
 
-def _texts(soup: BeautifulSoup, selector: str) -> List[str]:
-    values: List[str] = []
-    for node in soup.select(selector):
-        text = node.get_text(" ", strip=True)
+class _ScanDone(Exception):
+    pass
+
+
+class _TitleScanner(HTMLParser):
+    """Collect h1/h2/first-title texts in one streaming pass, stopping once the result is settled.
+
+    Nesting and text follow BeautifulSoup's html.parser tree and get_text(" ", strip=True). Character
+    data is buffered until the next node boundary, since BeautifulSoup keeps text around an ignored
+    end tag (`<br>a</br>b`) as one string. Scanning stops after the first non-empty
+    h1, the first title and 10 non-empty h2s have all been seen, so later h1s are not collected.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.h1: List[List[str]] = []
+        self.h2: List[List[str]] = []
+        self.title: Optional[List[str]] = None
+        self.title_done = False
+        self._stack: List[str] = []
+        # (stack depth, collected strings) for each open h1/h2/title.
+        self._captures: List[Tuple[int, List[str]]] = []
+        self._skip_depth = 0
+        # Character data since the last node boundary.
+        self._text: List[str] = []
+        # Void elements opened as <tag>; BeautifulSoup ignores one later </tag> for each.
+        self._closed_voids: List[str] = []
+
+    def _flush_text(self) -> None:
+        if not self._text:
+            return
+        text = "".join(self._text).strip()
+        self._text = []
         if text:
-            values.append(text)
-    return values
+            for _, parts in self._captures:
+                parts.append(text)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush_text()
+        if tag in _VOID_ELEMENTS:
+            self._closed_voids.append(tag)
+            return
+        depth = len(self._stack)
+        self._stack.append(tag)
+        if tag in _NON_TEXT_PARENTS:
+            self._skip_depth += 1
+        elif tag == "h1" or tag == "h2":
+            parts: List[str] = []
+            (self.h1 if tag == "h1" else self.h2).append(parts)
+            self._captures.append((depth, parts))
+        elif tag == "title" and self.title is None:
+            self.title = []
+            self._captures.append((depth, self.title))
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        if tag in _VOID_ELEMENTS:
+            self._flush_text()
+        else:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._closed_voids:
+            self._closed_voids.remove(tag)
+            return
+        self._flush_text()
+        # Like BeautifulSoup, an end tag closes everything opened after its matching start tag.
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth] == tag:
+                break
+        else:
+            return
+        self._skip_depth -= sum(1 for name in self._stack[depth:] if name in _NON_TEXT_PARENTS)
+        del self._stack[depth:]
+        while self._captures and self._captures[-1][0] >= depth:
+            if self._captures.pop()[1] is self.title:
+                self.title_done = True
+        if (
+            not self._captures
+            and self.title_done
+            and any(self.h1)
+            and sum(1 for parts in self.h2 if parts) >= 10
+        ):
+            raise _ScanDone
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth or not self._captures:
+            return
+        self._text.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush_text()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush_text()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush_text()
+        # BeautifulSoup keeps a CDATA section as its own text node.
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA[") :])
+            self._flush_text()
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+
+
+def _node_text(node) -> str:
+    """Same as BeautifulSoup get_text(" ", strip=True) for a selectolax node."""
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag == "-text" and child.parent.tag not in _NON_TEXT_PARENTS:
+            text = child.text_content.strip()
+            if text:
+                parts.append(text)
+    return " ".join(parts)
 
 
 def extract_title(html: str) -> Dict[str, object]:
-    soup = BeautifulSoup(html, "html.parser")
-
-    h1_list = _texts(soup, "h1")
-    h2_list = _texts(soup, "h2")
-    title_text = (soup.title.get_text(" ", strip=True) if soup.title else "")
+    if LexborHTMLParser is not None:
+        # C parser (lexbor) when selectolax is installed; a streaming html.parser scan otherwise.
+        tree = LexborHTMLParser(html)
+        # One selector query for all three tags; only the first <title> counts, even if empty.
+        h1_list, h2_list = [], []
+        title_text = None
+        for node in tree.css("h1, h2, title"):
+            if node.tag == "title":
+                if title_text is None:
+                    title_text = _node_text(node)
+                continue
+            text = _node_text(node)
+            if text:
+                (h1_list if node.tag == "h1" else h2_list).append(text)
+        title_text = title_text or ""
+    else:
+        scanner = _TitleScanner()
+        try:
+            scanner.feed(html)
+            scanner.close()
+        except _ScanDone:
+            pass
+        h1_list = [" ".join(parts) for parts in scanner.h1 if parts]
+        h2_list = [" ".join(parts) for parts in scanner.h2 if parts]
+        title_text = " ".join(scanner.title or [])
 
     if h1_list:
         selected = h1_list[0]
@@ -4,15 +4,25 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import shutil
 import subprocess
+import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 from uuid import uuid4
 
 from fetch_with_retry import FetchError, fetch_url
+from json_io import write_json
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Resolved once per process; None when pdftotext is not on PATH.
+_PDFTOTEXT = shutil.which("pdftotext")
 
 
 def is_go_jp_url(url: str) -> bool:
@@ -33,14 +43,36 @@ def make_run_id() -> str:
     return f"{ts}_{suffix}"
 
 
+def _pdfium_first_page_text(pdf_path: Path) -> str:
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        if len(pdf) == 0:
+            return ""
+        page = pdf[0]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
 def _extract_first_page_text(pdf_path: Path) -> tuple[str, str]:
-    """Extract first-page text with pdftotext when available."""
-    if not shutil.which("pdftotext"):
+    """Extract first-page text in-process with pypdfium2 when installed, else with pdftotext."""
+    if pdfium is not None:
+        try:
+            return _pdfium_first_page_text(pdf_path), "pypdfium2"
+        except Exception:  # unreadable for pdfium; let pdftotext try
+            pass
+    if not _PDFTOTEXT:
         return "", "pdftotext_not_found"
 
     try:
         proc = subprocess.run(
-            ["pdftotext", "-f", "1", "-l", "1", str(pdf_path), "-"],
+            [_PDFTOTEXT, "-f", "1", "-l", "1", str(pdf_path), "-"],
             check=False,
             capture_output=True,
         )
@@ -81,43 +113,50 @@ def main() -> int:
     if not is_go_jp_url(args.url):
         raise SystemExit("URL must be http(s) and in *.go.jp domain")
 
+    # Stream the body into a temp file; only the leading bytes stay in memory for the PDF check.
+    tmp_root = Path(args.tmp_root)
+    tmp_root.mkdir(parents=True, exist_ok=True)
+    part_file = tempfile.NamedTemporaryFile(dir=tmp_root, prefix=".download-", suffix=".pdf", delete=False)
+    part_path = Path(part_file.name)
+    # The part file is removed on any failure (including KeyboardInterrupt) until it becomes source.pdf.
     try:
-        result = fetch_url(args.url)
-    except FetchError as exc:
-        raise SystemExit(str(exc))
-
-    if not is_pdf_content(result.content_type, result.body):
-        raise SystemExit(
-            "Fetched content is not PDF. "
-            f"content_type={result.content_type!r}, first_bytes={result.body[:8]!r}"
-        )
-
-    run_id = args.run_id.strip() or make_run_id()
-    out_dir = Path(args.tmp_root) / run_id
-    out_dir.mkdir(parents=True, exist_ok=True)
+        with part_file as f:
+            try:
+                result = fetch_url(args.url, sink=f)
+            except FetchError as exc:
+                raise SystemExit(str(exc)) from exc
+
+        if not is_pdf_content(result.content_type, result.body):
+            raise SystemExit(
+                "Fetched content is not PDF. "
+                f"content_type={result.content_type!r}, first_bytes={result.body[:8]!r}"
+            )
+
+        run_id = args.run_id.strip() or make_run_id()
+        out_dir = tmp_root / run_id
+        out_dir.mkdir(parents=True, exist_ok=True)
+        pdf_path = out_dir / "source.pdf"
+        os.replace(part_path, pdf_path)
+    finally:
+        part_path.unlink(missing_ok=True)
 
     source = result.final_url or args.url
     original_filename = Path(unquote(urlparse(source).path)).name or "source.pdf"
-    pdf_path = out_dir / "source.pdf"
     first_page_path = out_dir / "first-page.txt"
     source_md_path = out_dir / "source.md"
     links_txt_path = out_dir / "pdf-links.txt"
     links_json_path = out_dir / "pdf-links.json"
     metadata_path = out_dir / "metadata.json"
 
-    pdf_path.write_bytes(result.body)
     first_page_text, first_page_method = _extract_first_page_text(pdf_path)
     first_page_path.write_text(first_page_text, encoding="utf-8")
     first_title = _first_non_empty_line(first_page_text)
+    # first_page_text is already stripped by both extractors.
     if first_page_text:
-        md_lines = []
-        if first_title:
-            md_lines.append(f"# {first_title}")
-            md_lines.append("")
-        md_lines.append(first_page_text)
-        source_md_path.write_text("\n".join(md_lines).strip() + "\n", encoding="utf-8")
+        source_md = f"# {first_title}\n\n{first_page_text}\n" if first_title else first_page_text + "\n"
     else:
-        source_md_path.write_text("", encoding="utf-8")
+        source_md = ""
+    source_md_path.write_text(source_md, encoding="utf-8")
     # Keep downstream compatibility with HTML flow artifacts.
     links_txt_path.write_text("", encoding="utf-8")
     links_json_path.write_text("[]\n", encoding="utf-8")
@@ -132,7 +171,7 @@ def main() -> int:
         "used_browser_headers": result.used_browser_headers,
         "original_filename": original_filename,
         "pdf_path": str(pdf_path),
-        "size_bytes": len(result.body),
+        "size_bytes": pdf_path.stat().st_size,
         "first_page_text_path": str(first_page_path),
         "first_page_extract_method": first_page_method,
         "first_page_text_length": len(first_page_text),
@@ -140,7 +179,7 @@ def main() -> int:
         "pdf_links_path": str(links_txt_path),
         "pdf_links_json_path": str(links_json_path),
     }
-    metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(metadata_path, metadata)
 
     print(str(metadata_path))
     return 0
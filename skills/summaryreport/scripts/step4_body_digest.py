@@ -4,16 +4,37 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 from urllib import error, request
 
+from json_io import dumps_compact, load_path, loads, write_json, write_json_atomic
+
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP4_BODY_MODEL", "gpt-5-mini")
+# Least recently used digests beyond this count are evicted from the --cache dir.
+CACHE_MAX_ENTRIES = 1000
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]+\)")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+# Line boundaries of str.splitlines(); the stop phrase may only span whitespace within one line.
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_STOP_RE = re.compile(rf"これまでの[^\S{_LINE_BREAKS}]*主な閣議決定・本部決定")
+# Share/navigation lines, dropped when a stripped line equals one of them exactly.
+_NOISE_LINES = frozenset({"ツイート", "facebookシェアする", "LINEで送る", "主な閣議決定・本部決定一覧ページに戻る"})
+_NUMBERED_LINE_RE = re.compile(r"^[0-9０-９]+[\.．]\s*|^[（(][0-9０-９]+[）)]\s*")
+_SYSTEM_PROMPT = (
+    "You extract body digest from markdown content. "
+    "Use only provided text; do not invent details. "
+    "For REPORT pages, preserve numbered structure if present (1., 2., 3. or （1）（2）...). "
+    "Return concise digest and key points."
+)
 
 
 def _read_text(path: Path) -> str:
@@ -44,31 +65,64 @@ def _strip_frontmatter(md: str) -> str:
 
 def _clean_body(md: str) -> str:
     body = _strip_frontmatter(md)
-    body = re.sub(r"<!--.*?-->", "", body, flags=re.DOTALL)
-    body = re.sub(r"!\[[^\]]*\]\([^)]+\)", "", body)
-    body = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1", body)
-    noise = [
-        r"^\s*ツイート\s*$",
-        r"^\s*facebookシェアする\s*$",
-        r"^\s*LINEで送る\s*$",
-        r"^\s*主な閣議決定・本部決定一覧ページに戻る\s*$",
-    ]
-    lines: list[str] = []
-    stop = False
-    for line in body.splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        if re.search(r"これまでの\s*主な閣議決定・本部決定", s):
-            stop = True
-            continue
-        if stop:
-            continue
-        if any(re.search(p, s) for p in noise):
-            continue
-        lines.append(s)
-    cleaned = "\n".join(lines).strip()
-    return re.sub(r"\n{3,}", "\n\n", cleaned)
+    # The passes stay sequential (each can expose matches for the next); skip those with nothing to do.
+    if "<!--" in body:
+        body = _COMMENT_RE.sub("", body)
+    if "![" in body:
+        body = _IMAGE_RE.sub("", body)
+    if "](" in body:
+        body = _LINK_RE.sub(r"\1", body)
+    # Everything from the line holding the stop phrase onward is dropped, so cut there before splitting.
+    stop = _STOP_RE.search(body)
+    if stop:
+        head = body[: stop.start()]
+        lines = head.splitlines()
+        if lines and head[-1] not in _LINE_BREAKS:
+            lines.pop()  # the stop line itself
+    else:
+        lines = body.splitlines()
+    # Kept lines are stripped and non-empty, so the result needs no blank-run collapsing.
+    return "\n".join(s for s in (line.strip() for line in lines) if s and s not in _NOISE_LINES)
+
+
+def _cache_path(cache_dir: Path, raw_md: str, page_type: str, title: str, date_yyyymmdd: str) -> Path:
+    h = hashlib.sha256(raw_md.encode("utf-8", errors="replace"))
+    for part in (page_type, title, date_yyyymmdd, OPENAI_MODEL, _SYSTEM_PROMPT):
+        h.update(b"\x00" + part.encode("utf-8", errors="replace"))
+    # Editing the prompt or schema must not keep serving digests produced under the old ones.
+    h.update(b"\x00" + dumps_compact(_schema()))
+    return cache_dir / f"{h.hexdigest()}.json"
+
+
+def _read_cached(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        cached = load_path(path)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return cached
+
+
+def _write_cached(path: Path, entry: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, entry)
+    entries = list(path.parent.glob("*.json"))
+    if len(entries) <= CACHE_MAX_ENTRIES:
+        return
+    by_mtime: list[tuple[float, Path]] = []
+    for p in entries:
+        try:
+            by_mtime.append((p.stat().st_mtime, p))
+        except OSError:
+            pass
+    by_mtime.sort()
+    for _, p in by_mtime[: len(by_mtime) - CACHE_MAX_ENTRIES]:
+        p.unlink(missing_ok=True)
 
 
 def _schema() -> dict[str, Any]:
@@ -88,12 +142,6 @@ def _call_llm(page_type: str, cleaned_body: str, title: str, date_yyyymmdd: str)
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
-    system_prompt = (
-        "You extract body digest from markdown content. "
-        "Use only provided text; do not invent details. "
-        "For REPORT pages, preserve numbered structure if present (1., 2., 3. or （1）（2）...). "
-        "Return concise digest and key points."
-    )
     user_payload = {
         "page_type": page_type,
         "title": title,
@@ -103,7 +151,7 @@ def _call_llm(page_type: str, cleaned_body: str, title: str, date_yyyymmdd: str)
     body = {
         "model": OPENAI_MODEL,
         "messages": [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
         ],
         "response_format": {
@@ -111,9 +159,10 @@ def _call_llm(page_type: str, cleaned_body: str, title: str, date_yyyymmdd: str)
             "json_schema": {"name": "step4_body_digest", "schema": _schema(), "strict": True},
         },
     }
+    # One call per process, so a keep-alive client would never reuse its connection.
     req = request.Request(
         f"{OPENAI_API_BASE}/chat/completions",
-        data=json.dumps(body).encode("utf-8"),
+        data=dumps_compact(body),
         method="POST",
         headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
     )
@@ -125,15 +174,16 @@ def _call_llm(page_type: str, cleaned_body: str, title: str, date_yyyymmdd: str)
         raise RuntimeError(f"LLM request failed: {exc.code} {detail}") from exc
     except error.URLError as exc:
         raise RuntimeError(f"LLM request failed: {exc}") from exc
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    return json.loads(data["choices"][0]["message"]["content"])
+    # Parse the envelope straight from bytes; with strict json_schema the content is itself a JSON string.
+    data = loads(raw)
+    return loads(data["choices"][0]["message"]["content"])
 
 
 def _fallback_digest(page_type: str, cleaned_body: str) -> dict[str, Any]:
     lines = [ln.strip() for ln in cleaned_body.splitlines() if ln.strip()]
     points: list[str] = []
     for ln in lines:
-        if re.match(r"^[0-9０-９]+[\.．]\s*", ln) or re.match(r"^[（(][0-9０-９]+[）)]\s*", ln):
+        if _NUMBERED_LINE_RE.match(ln):
             points.append(ln)
         if len(points) >= 8:
             break
@@ -154,6 +204,12 @@ def main() -> int:
     parser.add_argument("--source-md-file", default="", help="source.md path")
     parser.add_argument("--step2-file", default="", help="step2-metadata.json path")
     parser.add_argument("--output-file", default="", help="body-digest.json path")
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse digests for unchanged source.md from <tmp-root>/_cache/step4/",
+    )
     args = parser.parse_args()
 
     run_dir = Path(args.tmp_root) / args.run_id
@@ -168,25 +224,41 @@ def main() -> int:
     page_type = str(step2.get("page_type", "UNKNOWN"))
     title = str(step2.get("meeting_name", {}).get("value", ""))
     date_yyyymmdd = str(step2.get("date", {}).get("value", ""))
-    cleaned_body = _clean_body(raw_md)
 
-    llm_error = ""
-    try:
-        llm = _call_llm(page_type, cleaned_body, title, date_yyyymmdd)
-    except Exception as exc:  # pragma: no cover
-        llm_error = str(exc)
-        llm = _fallback_digest(page_type, cleaned_body)
+    cache_path = (
+        _cache_path(Path(args.tmp_root) / "_cache" / "step4", raw_md, page_type, title, date_yyyymmdd)
+        if args.cache
+        else None
+    )
+    digest = _read_cached(cache_path) if cache_path else None
+    if digest is None:
+        cleaned_body = _clean_body(raw_md)
+        llm_error = ""
+        try:
+            llm = _call_llm(page_type, cleaned_body, title, date_yyyymmdd)
+        except Exception as exc:  # pragma: no cover
+            llm_error = str(exc)
+            llm = _fallback_digest(page_type, cleaned_body)
+        digest = {
+            "source_type": llm.get("source_type", "none"),
+            "digest_ja": str(llm.get("digest_ja", "")),
+            "key_points": llm.get("key_points", []) if isinstance(llm.get("key_points"), list) else [],
+            "raw_body_text": cleaned_body,
+            "llm_error": llm_error or None,
+        }
+        # Fallback digests are not cached so the next run retries the LLM.
+        if cache_path and not llm_error:
+            try:
+                _write_cached(cache_path, digest)
+            except OSError:
+                pass
     payload = {
         "run_id": args.run_id,
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "source_md_path": str(source_md_path),
-        "source_type": llm.get("source_type", "none"),
-        "digest_ja": str(llm.get("digest_ja", "")),
-        "key_points": llm.get("key_points", []) if isinstance(llm.get("key_points"), list) else [],
-        "raw_body_text": cleaned_body,
-        "llm_error": llm_error or None,
+        **digest,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(out_path, payload)
     print(str(out_path))
     return 0
 
@@ -7,12 +7,13 @@ import argparse
 import json
 import os
 import re
+import tempfile
 from pathlib import Path
 from typing import Any
 from urllib import error, request
 from urllib.parse import unquote, urlparse
 
-from fetch_with_retry import FetchError, fetch_url
+from fetch_with_retry import FetchError, fetch_many
 
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP5_MODEL", "gpt-5-mini")
@@ -376,6 +377,8 @@ def _safe_filename_part(text: str) -> str:
 
 def _download_selected_pdfs(run_dir: Path, selected: list[dict[str, Any]]) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
+    # Rows still to download, fetched together below so same-host PDFs share pooled connections.
+    pending: list[dict[str, Any]] = []
     for i, item in enumerate(selected, start=1):
         url = item.get("url", "")
         existing_path = str(item.get("saved_path", "")).strip()
@@ -412,22 +415,39 @@ def _download_selected_pdfs(run_dir: Path, selected: list[dict[str, Any]]) -> li
             "downloaded": False,
         }
 
-        try:
-            fetched = fetch_url(url)
-            body = fetched.body
-            if not body.startswith(b"%PDF-"):
-                ctype = fetched.content_type or ""
-                if "pdf" not in ctype:
-                    raise FetchError(f"selected file is not PDF: url={url}, content_type={ctype!r}")
-            save_path.write_bytes(body)
-            row["downloaded"] = True
-            row["size_bytes"] = len(body)
-            row["content_type"] = fetched.content_type
-            row["used_browser_headers"] = fetched.used_browser_headers
-        except Exception as exc:  # keep pipeline running and record failure
-            row["error"] = str(exc)
-
         results.append(row)
+        pending.append(row)
+
+    # Each body streams into its own part file so only the sniffed head of each PDF stays in memory.
+    part_files: list[Any] = []
+    try:
+        for _ in pending:
+            part_files.append(
+                tempfile.NamedTemporaryFile(dir=run_dir, prefix=".download-", suffix=".pdf", delete=False)
+            )
+        fetched_rows = fetch_many([row["url"] for row in pending], sinks=part_files)
+        for f in part_files:
+            f.close()
+        for row, fetched, f in zip(pending, fetched_rows, part_files, strict=True):
+            url = row["url"]
+            try:
+                if isinstance(fetched, Exception):
+                    raise fetched
+                if not fetched.body.startswith(b"%PDF-"):
+                    ctype = fetched.content_type or ""
+                    if "pdf" not in ctype:
+                        raise FetchError(f"selected file is not PDF: url={url}, content_type={ctype!r}")
+                os.replace(f.name, row["saved_path"])
+                row["downloaded"] = True
+                row["size_bytes"] = Path(row["saved_path"]).stat().st_size
+                row["content_type"] = fetched.content_type
+                row["used_browser_headers"] = fetched.used_browser_headers
+            except Exception as exc:  # keep pipeline running and record failure
+                row["error"] = str(exc)
+    finally:
+        for f in part_files:
+            f.close()
+            Path(f.name).unlink(missing_ok=True)
     return results
 
 
@@ -5,13 +5,16 @@ from __future__ import annotations
 
 import argparse
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
 import step6_document_pipeline as s6
-import step7_conversion_pipeline as s7
-import step8_material_summarizer as s8
+from json_io import write_json
+
+# Step7 (conversion, worker side) and Step8 (LLM, parent side) are imported where used so
+# the coordinating process and the Step6->7 worker processes each load only their own stage.
 
 
 def _read_text(path: Path) -> str:
@@ -37,16 +40,14 @@ def _load_step5(run_dir: Path, step5_path: Path) -> tuple[list[dict[str, Any]],
     return selected, downloads, deferred
 
 
-def _build_analyze_targets(selected: list[dict[str, Any]], downloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    url_to_download = {d.get("url", ""): d for d in downloads if d.get("url")}
-    analyze_targets: list[dict[str, Any]] = []
-    for s in selected:
-        u = s.get("url", "")
-        merged = dict(s)
-        if u in url_to_download:
-            merged.update(url_to_download[u])
-        analyze_targets.append(merged)
-    return analyze_targets
+def _download_index(downloads: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {d["url"]: d for d in downloads if d.get("url")}
+
+
+def _build_analyze_targets(
+    selected: list[dict[str, Any]], url_to_download: dict[str, dict[str, Any]]
+) -> list[dict[str, Any]]:
+    return [{**s, **url_to_download.get(s.get("url", ""), {})} for s in selected]
 
 
 def _resolve_deferred_and_selection(
@@ -54,13 +55,15 @@ def _resolve_deferred_and_selection(
     analyze_targets: list[dict[str, Any]],
     selected: list[dict[str, Any]],
     deferred: list[dict[str, Any]],
+    workers: int,
 ) -> tuple[dict[str, int | None], list[dict[str, Any]], list[dict[str, Any]]]:
-    page_count_by_url: dict[str, int | None] = {}
-    for idx, item in enumerate(analyze_targets, start=1):
-        u = item.get("url", "")
-        if not u:
-            continue
-        page_count_by_url[u] = s6._page_count_from_item(run_dir, item, idx)
+    indexed = [(idx, item) for idx, item in enumerate(analyze_targets, start=1) if item.get("url", "")]
+    # Each count runs pdfinfo in a subprocess, so threads overlap them; map keeps the input order.
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(indexed)))) as ex:
+        counts = ex.map(lambda t: s6._page_count_from_item(run_dir, t[1], t[0]), indexed)
+        page_count_by_url: dict[str, int | None] = {
+            item["url"]: p for (_, item), p in zip(indexed, counts, strict=True)
+        }
 
     analysis_for_deferred = {u: {"page_count": p} for u, p in page_count_by_url.items()}
     resolved = s6._resolve_deferred(deferred, analysis_for_deferred)
@@ -68,42 +71,106 @@ def _resolve_deferred_and_selection(
     return page_count_by_url, resolved, final_selected
 
 
-def _build_final_targets(final_selected: list[dict[str, Any]], downloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    url_to_download = {d.get("url", ""): d for d in downloads if d.get("url")}
+def _build_final_targets(
+    final_selected: list[dict[str, Any]], url_to_download: dict[str, dict[str, Any]]
+) -> list[dict[str, Any]]:
+    merged = [{**s, **url_to_download.get(s.get("url", ""), {})} for s in final_selected]
     final_targets: list[dict[str, Any]] = []
-    for s in final_selected:
-        u = s.get("url", "")
-        merged = dict(s)
-        if u in url_to_download:
-            merged.update(url_to_download[u])
-        final_targets.append(merged)
+    # One worker per PDF: two selections resolving to the same file would be analyzed and summarized twice.
+    seen: set[str] = set()
+    for t in merged:
+        key = t.get("saved_path") or t.get("url", "")
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        # Targets without a path or URL are kept so they still produce an error row.
+        final_targets.append(t)
     return final_targets
 
 
-def _process_one(run_dir: Path, item: dict[str, Any], idx: int) -> dict[str, Any]:
+def _analyze_convert(run_dir: Path, item: dict[str, Any], idx: int) -> dict[str, Any]:
+    """Step6 analysis + Step7 conversion for one PDF (runs in a worker process)."""
+    import step7_conversion_pipeline as s7
+
     analysis = s6._analyze_one_pdf(run_dir, item, idx)
 
     conv_item = dict(item)
     conv_item["document_type"] = analysis.get("document_type", "mixed")
     conv_item["saved_path"] = analysis.get("saved_path", conv_item.get("saved_path", ""))
     converted = s7._convert_one(run_dir, conv_item, idx)
+    return {"analysis": analysis, "converted": converted}
 
-    if converted.get("converted") and converted.get("output_path"):
-        summary = s8._summarize_one(converted)
-    else:
-        summary = {
-            "url": converted.get("url", ""),
-            "title": converted.get("title", ""),
-            "document_type": converted.get("document_type", ""),
-            "read_strategy": "unreadable",
-            "used_sections": [],
-            "summary": "",
-            "key_points": [],
-            "empty_content": True,
-            "empty_reason": "conversion_error",
-            "error": converted.get("error", "conversion failed"),
-        }
-    return {"analysis": analysis, "converted": converted, "summary": summary}
+
+def _summarizable(converted: dict[str, Any]) -> bool:
+    return bool(converted.get("converted") and converted.get("output_path"))
+
+
+def _conversion_error_summary(converted: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "url": converted.get("url", ""),
+        "title": converted.get("title", ""),
+        "document_type": converted.get("document_type", ""),
+        "read_strategy": "unreadable",
+        "used_sections": [],
+        "summary": "",
+        "key_points": [],
+        "empty_content": True,
+        "empty_reason": "conversion_error",
+        "error": converted.get("error", "conversion failed"),
+    }
+
+
+def _summarize(converted: dict[str, Any]) -> dict[str, Any]:
+    """Step8 summary for one converted PDF (runs on a thread; bound by the LLM call)."""
+    import step8_material_summarizer as s8
+
+    if _summarizable(converted):
+        return s8._summarize_one(converted)
+    return _conversion_error_summary(converted)
+
+
+def _cpu_executor(workers: int, use_processes: bool) -> Executor:
+    if not use_processes:
+        return ThreadPoolExecutor(max_workers=workers)
+    # forkserver starts workers from a clean process that imports these modules once.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def _run_pipelined(
+    run_dir: Path, targets: list[dict[str, Any]], workers: int, use_processes: bool
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = [{} for _ in targets]
+    # Step8 for a PDF is submitted as soon as its Step6->7 finishes, so both pools stay busy.
+    with _cpu_executor(workers, use_processes) as cpu_ex, ThreadPoolExecutor(max_workers=workers) as llm_ex:
+        futures = {cpu_ex.submit(_analyze_convert, run_dir, t, i): i - 1 for i, t in enumerate(targets, start=1)}
+        pending = []
+        for fut in as_completed(futures):
+            row = fut.result()
+            rows[futures[fut]] = row  # results land in target order; no sort afterwards
+            pending.append((row, llm_ex.submit(_summarize, row["converted"])))
+        for row, fut in pending:
+            row["summary"] = fut.result()
+    return rows
+
+
+def _run_with_batch_api(
+    run_dir: Path, targets: list[dict[str, Any]], workers: int, use_processes: bool
+) -> list[dict[str, Any]]:
+    import step8_material_summarizer as s8
+
+    # Step8 waits for every conversion so all summaries go out as a single batch job.
+    with _cpu_executor(workers, use_processes) as cpu_ex:
+        futures = [cpu_ex.submit(_analyze_convert, run_dir, t, i) for i, t in enumerate(targets, start=1)]
+        rows = [fut.result() for fut in futures]
+    ready = [r for r in rows if _summarizable(r["converted"])]
+    summaries = s8.summarize_with_batch_api([r["converted"] for r in ready], workers)
+    for row, summary in zip(ready, summaries, strict=True):
+        row["summary"] = summary
+    for row in rows:
+        row.setdefault("summary", _conversion_error_summary(row["converted"]))
+    return rows
 
 
 def main() -> int:
@@ -119,32 +186,55 @@ def main() -> int:
         "--max-workers",
         type=int,
         default=4,
-        help="Parallel workers per PDF (each worker runs Step6->7->8 sequentially)",
+        help="Parallel workers per stage (Step6->7 per PDF in worker processes, Step8 on threads)",
+    )
+    parser.add_argument(
+        "--processes",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Run Step6->7 in worker processes (--no-processes: threads)",
+    )
+    parser.add_argument("--rpm", type=int, default=0, help="Max Step8 LLM requests per minute (0: unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Max estimated Step8 LLM tokens per minute (0: unlimited)")
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse Step8 LLM responses for unchanged requests from <tmp-root>/_cache/step8/cache.db",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Run all Step8 summaries as one OpenAI Batch API job after Step6->7 (asynchronous, lower cost)",
     )
     args = parser.parse_args()
+    import step8_material_summarizer as s8
+
+    s8.configure_rate_limits(args.rpm, args.tpm)
 
     run_dir = Path(args.tmp_root) / args.run_id
     run_dir.mkdir(parents=True, exist_ok=True)
+    s8.configure_cache(s8.default_cache_path(run_dir) if args.cache else None)
     step5_path = Path(args.step5_file) if args.step5_file else run_dir / "step5-material-selection.json"
 
     selected, downloads, deferred = _load_step5(run_dir, step5_path)
-    analyze_targets = _build_analyze_targets(selected, downloads)
+    url_to_download = _download_index(downloads)
+    analyze_targets = _build_analyze_targets(selected, url_to_download)
     page_counts, resolved, final_selected = _resolve_deferred_and_selection(
-        run_dir, analyze_targets, selected, deferred
+        run_dir, analyze_targets, selected, deferred, args.max_workers
     )
-    final_targets = _build_final_targets(final_selected, downloads)
+    final_targets = _build_final_targets(final_selected, url_to_download)
 
     workers = max(1, min(args.max_workers, max(1, len(final_targets))))
-    rows: list[dict[str, Any]] = []
-    with ThreadPoolExecutor(max_workers=workers) as ex:
-        futures = [ex.submit(_process_one, run_dir, t, i) for i, t in enumerate(final_targets, start=1)]
-        for fut in as_completed(futures):
-            rows.append(fut.result())
-    rows_sorted = sorted(rows, key=lambda x: x["converted"].get("index", 0))
-
-    analyses = [r["analysis"] for r in rows_sorted]
-    converted = [r["converted"] for r in rows_sorted]
-    summaries = [r["summary"] for r in rows_sorted]
+    if args.batch_api:
+        rows = _run_with_batch_api(run_dir, final_targets, workers, args.processes)
+    else:
+        rows = _run_pipelined(run_dir, final_targets, workers, args.processes)
+    # Both runners return rows in target order.
+    analyses = [r["analysis"] for r in rows]
+    converted = [r["converted"] for r in rows]
+    summaries = [r["summary"] for r in rows]
 
     step6_payload = {
         "run_id": args.run_id,
@@ -166,6 +256,7 @@ def main() -> int:
             "max_workers": workers,
             "model": s8.OPENAI_MODEL,
             "mode": "integrated_per_pdf",
+            "batch_api": args.batch_api,
         },
         "per_document": sorted(summaries, key=lambda x: x.get("title", "")),
     }
@@ -173,9 +264,9 @@ def main() -> int:
     step6_path = run_dir / "step6-document-pipeline.json"
     step7_path = run_dir / "step7-conversion.json"
     step8_path = run_dir / "step8-material-summaries.json"
-    step6_path.write_text(json.dumps(step6_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    step7_path.write_text(json.dumps(step7_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    step8_path.write_text(json.dumps(step8_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(step6_path, step6_payload)
+    write_json(step7_path, step7_payload)
+    write_json(step8_path, step8_payload)
 
     out = {
         "run_id": args.run_id,
@@ -184,7 +275,7 @@ def main() -> int:
             "step7": str(step7_path),
             "step8": str(step8_path),
         },
-        "processed_count": len(rows_sorted),
+        "processed_count": len(rows),
     }
     print(json.dumps(out, ensure_ascii=False))
     return 0
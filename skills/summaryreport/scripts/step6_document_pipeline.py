@@ -11,6 +11,15 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Optional
 
+from json_io import loads, read_bytes, write_json
+
+# Garbled/non-standard bullet glyphs (e.g., private-use symbols from embedded fonts,
+# geometric shapes not already covered by the standard bullet class).
+_RE_SYMBOL_BULLET = re.compile(
+    r"^\s*[\uE000-\uF8FF\u25A2-\u25B5\u25B8-\u25C5\u25C8-\u25CA\u25CC-\u25CE\u25D0-\u25EE\u25F0-\u25FF]{1,2}\s+",
+    re.MULTILINE,
+)
+
 
 def _read_text(path: Path) -> str:
     if not path.exists():
@@ -18,13 +27,28 @@ def _read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="replace")
 
 
+def _start_command(cmd: list[str]) -> subprocess.Popen[str]:
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _finish_command(proc: subprocess.Popen[str]) -> tuple[int, str, str]:
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+
 def _run_command(cmd: list[str]) -> tuple[int, str, str]:
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    return proc.returncode, proc.stdout, proc.stderr
+    return _finish_command(_start_command(cmd))
 
 
-def _pdf_page_count(pdf_path: Path) -> Optional[int]:
-    code, out, _ = _run_command(["pdfinfo", str(pdf_path)])
+def _pdfinfo_cmd(pdf_path: Path) -> list[str]:
+    return ["pdfinfo", str(pdf_path)]
+
+
+def _first5_cmd(pdf_path: Path, out_txt: Path) -> list[str]:
+    return ["pdftotext", "-f", "1", "-l", "5", str(pdf_path), str(out_txt)]
+
+
+def _parse_page_count(code: int, out: str) -> Optional[int]:
     if code != 0:
         return None
     m = re.search(r"^Pages:\s+(\d+)", out, re.MULTILINE)
@@ -33,11 +57,9 @@ def _pdf_page_count(pdf_path: Path) -> Optional[int]:
     return int(m.group(1))
 
 
-def _extract_first5_text(pdf_path: Path, out_txt: Path) -> tuple[bool, str]:
-    code, _, err = _run_command(["pdftotext", "-f", "1", "-l", "5", str(pdf_path), str(out_txt)])
-    if code != 0:
-        return False, err.strip()
-    return True, ""
+def _pdf_page_count(pdf_path: Path) -> Optional[int]:
+    code, out, _ = _run_command(_pdfinfo_cmd(pdf_path))
+    return _parse_page_count(code, out)
 
 
 def _count_topic_lines(text: str) -> int:
@@ -52,14 +74,21 @@ def _count_topic_lines(text: str) -> int:
 
 
 def _extract_features(text: str) -> dict[str, Any]:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    lines: list[str] = []
+    short_line_count = 0
+    for raw in text.splitlines():
+        s = raw.strip()
+        if not s:
+            continue
+        lines.append(s)
+        if len(s) <= 24:
+            short_line_count += 1
     joined = "\n".join(lines)
 
     sentence_like_count = len(re.findall(r"[。．.!！?？]\s*$", "\n".join(lines), re.MULTILINE))
     bullet_count = len(re.findall(r"^\s*[●・○◯■□◆◇▶▷➢①②③④⑤⑥⑦⑧⑨⑩]\s*", text, re.MULTILINE))
     bullet_count += len(re.findall(r"^\s*[\-\*]\s+", text, re.MULTILINE))
-    # Some PDFs use garbled/non-standard bullet glyphs (e.g., private-use symbols).
-    symbol_bullet_count = len(re.findall(r"^\s*[^\wぁ-んァ-ン一-龥A-Za-z0-9]{1,2}\s+", text, re.MULTILINE))
+    symbol_bullet_count = len(_RE_SYMBOL_BULLET.findall(text))
     bullet_count += symbol_bullet_count
     nominal_ending_count = len(
         re.findall(r"(について|に関して|の推進|の強化|の検討|の概要|の方針|の方向性)\s*$", "\n".join(lines), re.MULTILINE)
@@ -70,7 +99,6 @@ def _extract_features(text: str) -> dict[str, Any]:
     dearu_style_count = len(re.findall(r"(である|だ。)", joined))
     citation_count = len(re.findall(r"(によれば|によると|として|示す)", joined))
     reference_expr_count = len(re.findall(r"(下図|次の表|以下|上記|図\d|表\d)", joined))
-    short_line_count = len([ln for ln in lines if len(ln) <= 24])
     short_line_ratio = (short_line_count / len(lines)) if lines else 0.0
     topic_lines = _count_topic_lines(text)
     page_number_line_count = len(re.findall(r"^\s*\d{1,3}\s*$", text, re.MULTILINE))
@@ -95,7 +123,14 @@ def _extract_features(text: str) -> dict[str, Any]:
     }
 
 
-def _classify_document_type(title: str, first5_text: str, features: dict[str, Any]) -> tuple[str, str]:
+def _basic_features(text: str) -> dict[str, Any]:
+    return {
+        "line_count": sum(1 for ln in text.splitlines() if ln.strip()),
+        "paragraph_count": len([p for p in re.split(r"\n\s*\n", text) if p.strip()]),
+    }
+
+
+def _classify_by_title(title: str, first5_text: str) -> Optional[tuple[str, str]]:
     t = (title or "").strip()
     joined = first5_text
 
@@ -113,6 +148,11 @@ def _classify_document_type(title: str, first5_text: str, features: dict[str, An
     if any(k in t for k in ("調査結果", "アンケート")):
         return "survey_report", "調査系キーワード"
 
+    return None
+
+
+def _classify_document_type(features: dict[str, Any]) -> tuple[str, str]:
+    """Score word-like vs slide-like layout; title keyword rules are applied by the caller first."""
     word_score = 0
     ppt_score = 0
 
@@ -183,16 +223,32 @@ def _analyze_one_pdf(run_dir: Path, item: dict[str, Any], idx: int) -> dict[str,
         result["error"] = "pdf file not available for analysis"
         return result
 
-    page_count = _pdf_page_count(pdf_path)
     first5_path = run_dir / f"step6-first5-{idx:02d}.txt"
-    ok, err = _extract_first5_text(pdf_path, first5_path)
-    if not ok:
-        result["error"] = f"pdftotext failed: {err}"
+    # pdfinfo and pdftotext are independent; run both processes concurrently.
+    info_proc = _start_command(_pdfinfo_cmd(pdf_path))
+    try:
+        text_proc = _start_command(_first5_cmd(pdf_path, first5_path))
+    except BaseException:
+        # e.g. pdftotext missing while pdfinfo started: reap pdfinfo and close its pipes first.
+        info_proc.kill()
+        info_proc.communicate()
+        raise
+    info_code, info_out, _ = _finish_command(info_proc)
+    text_code, _, text_err = _finish_command(text_proc)
+    page_count = _parse_page_count(info_code, info_out)
+    if text_code != 0:
+        result["error"] = f"pdftotext failed: {text_err.strip()}"
         return result
 
     text = _read_text(first5_path)
-    features = _extract_features(text)
-    doc_type, reason = _classify_document_type(title, text, features)
+    # Keyword rules decide the type from the title alone; skip full feature extraction then.
+    by_title = _classify_by_title(title, text)
+    if by_title:
+        features = _basic_features(text)
+        doc_type, reason = by_title
+    else:
+        features = _extract_features(text)
+        doc_type, reason = _classify_document_type(features)
     strategy = _analysis_strategy(doc_type)
 
     result.update(
@@ -312,11 +368,11 @@ def main() -> int:
     step5_path = Path(args.step5_file) if args.step5_file else run_dir / "step5-material-selection.json"
     out_path = Path(args.output_file) if args.output_file else run_dir / "step6-document-pipeline.json"
 
-    raw = _read_text(step5_path)
+    raw = read_bytes(step5_path)
     if not raw:
         raise SystemExit(f"step5 file not found or empty: {step5_path}")
     try:
-        step5 = json.loads(raw)
+        step5 = loads(raw)
     except json.JSONDecodeError as exc:
         raise SystemExit(f"invalid step5 json: {exc}") from exc
 
@@ -376,7 +432,7 @@ def main() -> int:
         "resolved_deferred_decisions": resolved,
         "final_selected_pdfs": final_selected,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(out_path, payload)
     print(str(out_path))
     return 0
 
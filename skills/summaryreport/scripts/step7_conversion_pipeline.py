@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Any
 from urllib import error, request
 
+from json_io import loads, read_bytes, write_json
 
 HIGH_PRIORITY_KEYWORDS = [
     "背景",
@@ -44,6 +45,9 @@ LOW_PRIORITY_KEYWORDS = [
     "注記",
 ]
 
+_HIGH_PRIORITY_LOWER = tuple(k.lower() for k in HIGH_PRIORITY_KEYWORDS)
+_LOW_PRIORITY_LOWER = tuple(k.lower() for k in LOW_PRIORITY_KEYWORDS)
+
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP7_MODEL", "gpt-5-mini")
 
@@ -164,10 +168,10 @@ def _extract_important_pages_from_text(full_text: str) -> list[int]:
             continue
         title = " ".join(lines[:2]).lower()
 
-        if any(k.lower() in title for k in LOW_PRIORITY_KEYWORDS):
+        if any(k in title for k in _LOW_PRIORITY_LOWER):
             continue
 
-        if any(k.lower() in title for k in HIGH_PRIORITY_KEYWORDS):
+        if any(k in title for k in _HIGH_PRIORITY_LOWER):
             important.append(i)
             continue
 
@@ -342,11 +346,11 @@ def main() -> int:
     step6_path = Path(args.step6_file) if args.step6_file else run_dir / "step6-document-pipeline.json"
     out_path = Path(args.output_file) if args.output_file else run_dir / "step7-conversion.json"
 
-    raw = _read_text(step6_path)
+    raw = read_bytes(step6_path)
     if not raw:
         raise SystemExit(f"step6 file not found or empty: {step6_path}")
     try:
-        step6 = json.loads(raw)
+        step6 = loads(raw)
     except json.JSONDecodeError as exc:
         raise SystemExit(f"invalid step6 json: {exc}") from exc
 
@@ -386,7 +390,7 @@ def main() -> int:
         },
         "converted_documents": converted_sorted,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(out_path, payload)
     print(str(out_path))
     return 0
 
@@ -4,13 +4,27 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import heapq
+import http.client
 import json
 import os
+import random
 import re
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_right
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import count
 from pathlib import Path
 from typing import Any, Optional
-from urllib import error, request
+
+from json_io import loads, read_bytes, write_json_records
+from llm_http import KeepAliveClient
+from openai_batch import BatchError, request_line, run_batch
 
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP8_MODEL", "gpt-5-mini")
@@ -19,6 +33,104 @@ HIGH_PRIORITY_KWS = ["概要", "要旨", "サマリー", "エグゼクティブ"
 MEDIUM_PRIORITY_KWS = ["背景", "目的", "経緯", "課題", "現状"]
 LOW_PRIORITY_KWS = ["参考", "補足", "附属", "詳細データ", "免責", "注記"]
 
+_HIGH_PRIORITY_RE = re.compile("|".join(map(re.escape, HIGH_PRIORITY_KWS)))
+_MEDIUM_PRIORITY_RE = re.compile("|".join(map(re.escape, MEDIUM_PRIORITY_KWS)))
+_LOW_PRIORITY_RE = re.compile("|".join(map(re.escape, LOW_PRIORITY_KWS)))
+_OPENING_RE = re.compile(r"^(本資料|この資料|本書|本報告書|本文書)は[、,\s]*")
+# Line boundaries recognized by str.splitlines().
+_LINE_BREAK_RE = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+_NEWLINE_RE = re.compile("\n")
+
+LLM_MAX_ATTEMPTS = 4
+LLM_TIMEOUT_SEC = 180
+# --batch-api: how often to poll the batch, and how long to wait before falling back to regular requests.
+BATCH_API_POLL_SEC = float(os.getenv("SUMMARYREPORT_STEP8_BATCH_POLL_SEC", "30"))
+BATCH_API_MAX_WAIT_SEC = float(os.getenv("SUMMARYREPORT_STEP8_BATCH_MAX_WAIT_SEC", "3600"))
+
+_CLIENT = KeepAliveClient(OPENAI_API_BASE)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously up to `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.refill_rate
+            time.sleep(wait)
+
+
+_RPM_BUCKET: Optional[TokenBucket] = None
+_TPM_BUCKET: Optional[TokenBucket] = None
+
+
+def configure_rate_limits(rpm: int, tpm: int) -> None:
+    """Enable request/token per-minute limits for _call_llm (0 disables a limit)."""
+    global _RPM_BUCKET, _TPM_BUCKET
+    _RPM_BUCKET = TokenBucket(rpm) if rpm > 0 else None
+    _TPM_BUCKET = TokenBucket(tpm) if tpm > 0 else None
+
+
+class ResponseCache:
+    """SQLite store of LLM response contents keyed by a hash of the exact request body."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+
+    @staticmethod
+    def key(req_body: bytes) -> str:
+        # The body carries model, system prompt, schema and prepared text, so any change misses.
+        return hashlib.blake2b(req_body, digest_size=32).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO kv (key, response) VALUES (?, ?)", (key, response))
+
+
+_RESPONSE_CACHE: Optional[ResponseCache] = None
+
+
+def configure_cache(path: Optional[Path]) -> None:
+    """Reuse LLM responses stored at `path` across runs (None disables the cache)."""
+    global _RESPONSE_CACHE
+    _RESPONSE_CACHE = ResponseCache(path) if path else None
+
+
+def default_cache_path(run_dir: Path) -> Path:
+    return run_dir.parent / "_cache" / "step8" / "cache.db"
+
+
+def _retry_after_seconds(headers: http.client.HTTPMessage) -> Optional[float]:
+    value = headers.get("Retry-After") or ""
+    try:
+        return max(0.0, float(value.strip()))
+    except ValueError:
+        return None
+
 
 def _read_text(path: Path) -> str:
     if not path.exists():
@@ -27,9 +139,11 @@ def _read_text(path: Path) -> str:
 
 
 def _count_lines(text: str) -> int:
+    """Same as len(text.splitlines()) without materializing the line list."""
     if not text:
         return 0
-    return len(text.splitlines())
+    breaks = sum(1 for _ in _LINE_BREAK_RE.finditer(text))
+    return breaks if _LINE_BREAK_RE.match(text, len(text) - 1) else breaks + 1
 
 
 def _trim_chars(text: str, max_chars: int) -> str:
@@ -40,17 +154,59 @@ def _trim_chars(text: str, max_chars: int) -> str:
     return f"{head}\n\n[...TRUNCATED...]\n\n{tail}"
 
 
-def _keyword_hit(line: str, keywords: list[str]) -> bool:
-    return any(k in line for k in keywords)
+def _estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 ASCII chars per token, ~1 token per other (mostly CJK) char."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return len(text) - ascii_chars + ascii_chars // 4
 
 
-def _collect_windows(lines: list[str], hit_indices: list[int], before: int, after: int) -> list[tuple[int, int]]:
+def _trim_tokens(text: str, max_tokens: int) -> str:
+    """Like _trim_chars, but the cap is an estimated token budget (same as chars for CJK text)."""
+    tokens = _estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    return _trim_chars(text, len(text) * max_tokens // tokens)
+
+
+def _line_offsets(text: str) -> tuple[str, list[int]]:
+    """Normalize splitlines() boundaries to single newlines and return (joined, line start offsets)."""
+    if not text:
+        return "", []
+    joined = _LINE_BREAK_RE.sub("\n", text)
+    if joined.endswith("\n"):
+        joined = joined[:-1]
+    starts = [0]
+    starts += map(re.Match.end, _NEWLINE_RE.finditer(joined))
+    return joined, starts
+
+
+def _line_span(joined: str, line_starts: list[int], start: int, end: int) -> str:
+    """Slice lines [start, end) out of joined text without the trailing newline."""
+    stop = line_starts[end] - 1 if end < len(line_starts) else len(joined)
+    return joined[line_starts[start] : stop]
+
+
+def _keyword_hit_lines(pattern: re.Pattern[str], joined: str, line_starts: list[int]) -> list[int]:
+    """Return sorted indices of lines (joined by single newlines) containing a pattern match."""
+    hits: list[int] = []
+    m = pattern.search(joined)
+    while m:
+        i = bisect_right(line_starts, m.start()) - 1
+        hits.append(i)
+        if i + 1 >= len(line_starts):
+            break
+        # Each line counts once; resume scanning at the next line.
+        m = pattern.search(joined, line_starts[i + 1])
+    return hits
+
+
+def _collect_windows(line_count: int, hit_indices: list[int], before: int, after: int) -> list[tuple[int, int]]:
     if not hit_indices:
         return []
     intervals: list[tuple[int, int]] = []
     for idx in hit_indices:
         start = max(0, idx - before)
-        end = min(len(lines), idx + after + 1)
+        end = min(line_count, idx + after + 1)
         intervals.append((start, end))
     intervals.sort()
     merged: list[tuple[int, int]] = []
@@ -65,14 +221,32 @@ def _collect_windows(lines: list[str], hit_indices: list[int], before: int, afte
     return merged
 
 
+def _assemble_blocks(
+    joined: str,
+    line_starts: list[int],
+    head: str,
+    tail: Optional[str],
+    windows: list[tuple[int, int]],
+    section_type: str,
+    used_sections: list[dict[str, Any]],
+) -> str:
+    """Join head, non-empty line windows and tail with blank lines in a single join."""
+    spans = [(s, e) for s, e in windows if e > s]
+    used_sections.extend({"type": section_type, "line_from": s + 1, "line_to": e} for s, e in spans)
+    blocks = [head, *(_line_span(joined, line_starts, s, e) for s, e in spans)]
+    if tail is not None:
+        blocks.append(tail)
+    return "\n\n".join(blocks)
+
+
 def _extract_text_by_strategy(doc_type: str, output_format: str, text: str) -> tuple[str, str, list[dict[str, Any]]]:
-    lines = text.splitlines()
-    line_count = len(lines)
+    # Count lines first; the full-text strategies below never need per-line offsets.
+    line_count = _count_lines(text)
     used_sections: list[dict[str, Any]] = []
 
     if output_format == "markdown" and doc_type == "powerpoint_like":
         strategy = "ppt_selected_pages_md"
-        prepared = _trim_chars(text, 18000)
+        prepared = _trim_tokens(text, 18000)
         used_sections.append({"type": "all_selected_pages_markdown", "line_from": 1, "line_to": line_count})
         return strategy, prepared, used_sections
 
@@ -81,61 +255,42 @@ def _extract_text_by_strategy(doc_type: str, output_format: str, text: str) -> t
         strategy = "word_small"
         prepared = text
         used_sections.append({"type": "full_text", "line_from": 1, "line_to": line_count})
-        return strategy, _trim_chars(prepared, 22000), used_sections
+        return strategy, _trim_tokens(prepared, 22000), used_sections
 
-    # common parts
+    # common parts (sliced by line offsets instead of materializing a list of lines)
+    joined, line_starts = _line_offsets(text)
     first_n = 200 if line_count <= 6000 else 150
     last_n = 120
-    head = lines[:first_n]
-    tail = lines[-last_n:] if line_count > last_n else []
-    used_sections.append({"type": "head", "line_from": 1, "line_to": len(head)})
-    if tail:
-        used_sections.append({"type": "tail", "line_from": line_count - len(tail) + 1, "line_to": line_count})
-
-    high_hits = [i for i, ln in enumerate(lines) if _keyword_hit(ln, HIGH_PRIORITY_KWS)]
-    med_hits = [i for i, ln in enumerate(lines) if _keyword_hit(ln, MEDIUM_PRIORITY_KWS)]
-    low_hits = [i for i, ln in enumerate(lines) if _keyword_hit(ln, LOW_PRIORITY_KWS)]
+    head_end = min(first_n, line_count)
+    head = _line_span(joined, line_starts, 0, head_end)
+    has_tail = line_count > last_n
+    tail = _line_span(joined, line_starts, line_count - last_n, line_count) if has_tail else None
+    used_sections.append({"type": "head", "line_from": 1, "line_to": head_end})
+    if has_tail:
+        used_sections.append({"type": "tail", "line_from": line_count - last_n + 1, "line_to": line_count})
+
+    high_hits = _keyword_hit_lines(_HIGH_PRIORITY_RE, joined, line_starts)
+    med_hits = _keyword_hit_lines(_MEDIUM_PRIORITY_RE, joined, line_starts)
+    low_hits = _keyword_hit_lines(_LOW_PRIORITY_RE, joined, line_starts)
 
     if line_count <= 6000:
         strategy = "word_medium"
-        windows = _collect_windows(lines, high_hits + med_hits, before=8, after=20)
-        chunk_lines: list[str] = []
-        chunk_lines.extend(head)
-        for s, e in windows:
-            block = lines[s:e]
-            if block:
-                used_sections.append({"type": "keyword_window", "line_from": s + 1, "line_to": e})
-                chunk_lines.append("")
-                chunk_lines.extend(block)
-        if tail:
-            chunk_lines.append("")
-            chunk_lines.extend(tail)
-        prepared = "\n".join(chunk_lines)
-        return strategy, _trim_chars(prepared, 24000), used_sections
+        windows = _collect_windows(line_count, high_hits + med_hits, before=8, after=20)
+        prepared = _assemble_blocks(joined, line_starts, head, tail, windows, "keyword_window", used_sections)
+        return strategy, _trim_tokens(prepared, 24000), used_sections
 
     # very large
     strategy = "word_large" if line_count <= 12000 else "word_xlarge"
-    windows = _collect_windows(lines, high_hits, before=6, after=14)
-    chunk_lines = []
-    chunk_lines.extend(head)
-    for s, e in windows:
-        block = lines[s:e]
-        if block:
-            used_sections.append({"type": "high_priority_window", "line_from": s + 1, "line_to": e})
-            chunk_lines.append("")
-            chunk_lines.extend(block)
-    if tail:
-        chunk_lines.append("")
-        chunk_lines.extend(tail)
-
-    # if low-priority hits are dominant and no high hits, keep only head+tail.
-    if not high_hits and len(low_hits) > len(med_hits):
-        chunk_lines = head + [""] + tail
+    windows = _collect_windows(line_count, high_hits, before=6, after=14)
+    # if low-priority hits are dominant and no high hits, keep only head+tail
+    # (with no high hits there are no windows, so the assembly below is already head+tail).
+    low_dominant = not high_hits and len(low_hits) > len(med_hits)
+    prepared = _assemble_blocks(joined, line_starts, head, tail, windows, "high_priority_window", used_sections)
+    if low_dominant:
         used_sections.append({"type": "low_priority_dominant", "line_from": 1, "line_to": line_count})
 
-    prepared = "\n".join(chunk_lines)
-    max_chars = 20000 if strategy == "word_large" else 14000
-    return strategy, _trim_chars(prepared, max_chars), used_sections
+    max_tokens = 20000 if strategy == "word_large" else 14000
+    return strategy, _trim_tokens(prepared, max_tokens), used_sections
 
 
 def _response_schema() -> dict[str, Any]:
@@ -160,7 +315,7 @@ def _normalize_summary_opening(text: str) -> str:
     if not text:
         return text
     normalized = text.strip()
-    normalized = re.sub(r"^(本資料|この資料|本書|本報告書|本文書)は[、,\s]*", "", normalized)
+    normalized = _OPENING_RE.sub("", normalized)
     return normalized
 
 
@@ -178,76 +333,182 @@ def _enforce_summary_max_chars(text: str, max_chars: int = 2000) -> str:
     return clipped
 
 
-def _call_llm(doc: dict[str, Any], prepared_text: str) -> dict[str, Any]:
+SYSTEM_PROMPT = (
+    "You summarize Japanese policy documents precisely. "
+    "Use only provided text, do not infer unstated facts. "
+    "If content is effectively empty (cover-only etc.), return empty_content=true. "
+    "Write summary in plain Japanese with concrete subject from content. "
+    "Do not start summary with generic lead-ins like '本資料は' or 'この資料は'. "
+    "At this stage, do not over-compress: keep most major points that appear in key_points. "
+    "Target roughly 800-1600 Japanese characters when material is substantial, "
+    "and keep summary within 2000 characters."
+)
+SUMMARY_LENGTH_GUIDANCE = "2000文字以内。内容が十分ある場合は800-1600文字目安。主要論点はkey_pointsと整合してなるべく含める。"
+
+# Small text documents are packed into one request up to this many prepared chars.
+BATCH_BUDGET_CHARS = 16000
+BATCH_SOLO_MIN_CHARS = 8000
+
+
+def _post_chat(req_body: bytes, estimated_tokens: int) -> dict[str, Any]:
+    cache_key = ""
+    if _RESPONSE_CACHE:
+        cache_key = _RESPONSE_CACHE.key(req_body)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return loads(cached)
+
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
 
-    system_prompt = (
-        "You summarize Japanese policy documents precisely. "
-        "Use only provided text, do not infer unstated facts. "
-        "If content is effectively empty (cover-only etc.), return empty_content=true. "
-        "Write summary in plain Japanese with concrete subject from content. "
-        "Do not start summary with generic lead-ins like '本資料は' or 'この資料は'. "
-        "At this stage, do not over-compress: keep most major points that appear in key_points. "
-        "Target roughly 800-1600 Japanese characters when material is substantial, "
-        "and keep summary within 2000 characters."
-    )
-    user_payload = {
-        "document_title": doc.get("title", ""),
-        "document_type": doc.get("document_type", ""),
-        "read_strategy": doc.get("read_strategy", ""),
-        "summary_length_guidance": "2000文字以内。内容が十分ある場合は800-1600文字目安。主要論点はkey_pointsと整合してなるべく含める。",
-        "text": prepared_text,
-    }
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        if _RPM_BUCKET:
+            _RPM_BUCKET.acquire(1)
+        if _TPM_BUCKET:
+            _TPM_BUCKET.acquire(estimated_tokens)
+        try:
+            status, resp_headers, raw = _CLIENT.post("/chat/completions", req_body, headers, LLM_TIMEOUT_SEC)
+        except (OSError, http.client.HTTPException) as exc:
+            raise RuntimeError(f"LLM request failed: {exc}") from exc
+        if status < 400:
+            break
+        detail = raw.decode("utf-8", errors="replace")
+        if status != 429 or attempt + 1 == LLM_MAX_ATTEMPTS:
+            raise RuntimeError(f"LLM request failed: {status} {detail}")
+        # Rate limited: honor Retry-After as a floor, then exponential backoff with jitter.
+        delay = 2**attempt + random.uniform(0, 1)
+        retry_after = _retry_after_seconds(resp_headers)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        time.sleep(delay)
+
+    data = loads(raw)
+    content = data["choices"][0]["message"]["content"]
+    parsed = loads(content)
+    if cache_key:
+        _RESPONSE_CACHE.put(cache_key, content)
+    return parsed
+
+
+# Placeholder for the user message while pre-serializing the static request body.
+_USER_CONTENT_SLOT = "\x00user_content\x00"
+
+
+def _body_frame(schema_name: str, schema: dict[str, Any]) -> tuple[bytes, bytes]:
+    """Serialize the request body once, split around the user message content."""
     body = {
         "model": OPENAI_MODEL,
         "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": _USER_CONTENT_SLOT},
         ],
         "response_format": {
             "type": "json_schema",
-            "json_schema": {"name": "step8_material_summary", "schema": _response_schema(), "strict": True},
+            "json_schema": {"name": schema_name, "schema": schema, "strict": True},
         },
     }
+    prefix, suffix = json.dumps(body).encode("utf-8").split(json.dumps(_USER_CONTENT_SLOT).encode("utf-8"))
+    return prefix, suffix
 
-    req = request.Request(
-        f"{OPENAI_API_BASE}/chat/completions",
-        data=json.dumps(body).encode("utf-8"),
-        method="POST",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-    )
-    try:
-        with request.urlopen(req, timeout=180) as resp:
-            raw = resp.read()
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"LLM request failed: {exc.code} {detail}") from exc
-    except error.URLError as exc:
-        raise RuntimeError(f"LLM request failed: {exc}") from exc
-
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    content = data["choices"][0]["message"]["content"]
-    return json.loads(content)
 
+def _request_body(frame: tuple[bytes, bytes], user_payload: dict[str, Any]) -> bytes:
+    content = json.dumps(user_payload, ensure_ascii=False)
+    return frame[0] + json.dumps(content).encode("utf-8") + frame[1]
 
-def _summarize_one(doc: dict[str, Any]) -> dict[str, Any]:
-    output_path = Path(str(doc.get("output_path", "")))
-    raw_text = _read_text(output_path)
-    if not raw_text:
-        return {
-            "url": doc.get("url", ""),
+
+def _solo_request_body(doc: dict[str, Any], prepared_text: str) -> bytes:
+    user_payload = {
+        "document_title": doc.get("title", ""),
+        "document_type": doc.get("document_type", ""),
+        "read_strategy": doc.get("read_strategy", ""),
+        "summary_length_guidance": SUMMARY_LENGTH_GUIDANCE,
+        "text": prepared_text,
+    }
+    return _request_body(_SOLO_FRAME, user_payload)
+
+
+def _call_llm(doc: dict[str, Any], prepared_text: str) -> dict[str, Any]:
+    return _post_chat(_solo_request_body(doc, prepared_text), _estimate_tokens(prepared_text) + 2000)
+
+
+def _batch_response_schema(count: int) -> dict[str, Any]:
+    item = _response_schema()
+    item = {
+        **item,
+        "properties": {"id": {"type": "string"}, **item["properties"]},
+        "required": ["id", *item["required"]],
+    }
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "results": {"type": "array", "items": item, "minItems": count, "maxItems": count},
+        },
+        "required": ["results"],
+    }
+
+
+_SOLO_FRAME = _body_frame("step8_material_summary", _response_schema())
+
+
+@lru_cache(maxsize=None)
+def _batch_frame(count: int) -> tuple[bytes, bytes]:
+    return _body_frame("step8_material_summary_batch", _batch_response_schema(count))
+
+
+def _call_llm_batch(items: list[tuple[dict[str, Any], dict[str, Any], str]]) -> dict[str, dict[str, Any]]:
+    """Summarize several small documents in one request; returns per-doc results keyed by id."""
+    documents = [
+        {
+            "id": str(i),
             "title": doc.get("title", ""),
             "document_type": doc.get("document_type", ""),
-            "read_strategy": "unreadable",
-            "used_sections": [],
-            "summary": "",
-            "key_points": [],
-            "empty_content": True,
-            "empty_reason": "output file missing or empty",
-            "error": "input text missing",
+            "read_strategy": payload["read_strategy"],
+            "text": prepared,
         }
+        for i, (doc, payload, prepared) in enumerate(items)
+    ]
+    user_payload = {
+        "instruction": "documents の各要素を個別に要約し、results に id ごとに1件ずつ返す。文書間で内容を混ぜない。",
+        "summary_length_guidance": SUMMARY_LENGTH_GUIDANCE,
+        "documents": documents,
+    }
+    prepared_tokens = sum(_estimate_tokens(prepared) for _, _, prepared in items)
+    parsed = _post_chat(_request_body(_batch_frame(len(items)), user_payload), prepared_tokens + 2000 * len(items))
+    results = parsed.get("results", [])
+    if not isinstance(results, list):
+        raise RuntimeError("LLM response format invalid: results is not a list")
+    out: dict[str, dict[str, Any]] = {}
+    for row in results:
+        if isinstance(row, dict) and "id" in row:
+            rid = str(row.pop("id"))
+            out.setdefault(rid, row)
+    return out
+
+
+def _unreadable_payload(doc: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "url": doc.get("url", ""),
+        "title": doc.get("title", ""),
+        "document_type": doc.get("document_type", ""),
+        "read_strategy": "unreadable",
+        "used_sections": [],
+        "summary": "",
+        "key_points": [],
+        "empty_content": True,
+        "empty_reason": "output file missing or empty",
+        "error": "input text missing",
+    }
+
+
+def _prepare_payload(doc: dict[str, Any]) -> tuple[dict[str, Any], str]:
+    """Build the base per-document payload and prepared LLM text ("" when unreadable)."""
+    output_path = Path(str(doc.get("output_path", "")))
+    raw_text = _read_text(output_path)
+    if not raw_text:
+        return _unreadable_payload(doc), ""
 
     strategy, prepared, used_sections = _extract_text_by_strategy(
         str(doc.get("document_type", "")),
@@ -266,25 +527,153 @@ def _summarize_one(doc: dict[str, Any]) -> dict[str, Any]:
         "used_sections": used_sections,
         "llm_model": OPENAI_MODEL,
     }
+    return payload, prepared
+
+
+def _apply_llm_result(payload: dict[str, Any], llm: dict[str, Any]) -> None:
+    summary = _normalize_summary_opening(str(llm.get("summary", "")))
+    llm["summary"] = _enforce_summary_max_chars(summary, max_chars=2000)
+    payload.update(llm)
+
 
+def _apply_llm_error(payload: dict[str, Any], exc: Exception) -> None:
+    payload.update(
+        {
+            "summary": "",
+            "key_points": [],
+            "empty_content": True,
+            "empty_reason": "llm_error",
+            "error": str(exc),
+        }
+    )
+
+
+def _summarize_prepared(doc: dict[str, Any], payload: dict[str, Any], prepared: str) -> dict[str, Any]:
     try:
-        llm = _call_llm({**doc, "read_strategy": strategy}, prepared)
-        llm["summary"] = _normalize_summary_opening(str(llm.get("summary", "")))
-        llm["summary"] = _enforce_summary_max_chars(str(llm.get("summary", "")), max_chars=2000)
-        payload.update(llm)
+        llm = _call_llm({**doc, "read_strategy": payload["read_strategy"]}, prepared)
+        _apply_llm_result(payload, llm)
     except Exception as exc:
-        payload.update(
-            {
-                "summary": "",
-                "key_points": [],
-                "empty_content": True,
-                "empty_reason": "llm_error",
-                "error": str(exc),
-            }
-        )
+        _apply_llm_error(payload, exc)
     return payload
 
 
+def _summarize_one(doc: dict[str, Any]) -> dict[str, Any]:
+    payload, prepared = _prepare_payload(doc)
+    if not prepared:
+        return payload
+    return _summarize_prepared(doc, payload, prepared)
+
+
+def _summarize_batch(items: list[tuple[dict[str, Any], dict[str, Any], str]]) -> list[dict[str, Any]]:
+    try:
+        results = _call_llm_batch(items)
+    except Exception:
+        results = {}
+    out: list[dict[str, Any]] = []
+    for i, (doc, payload, prepared) in enumerate(items):
+        llm = results.get(str(i))
+        if llm is None:
+            # Batch failed or dropped this document: fall back to a solo request.
+            out.append(_summarize_prepared(doc, payload, prepared))
+            continue
+        payload["llm_batch_size"] = len(items)
+        _apply_llm_result(payload, llm)
+        out.append(payload)
+    return out
+
+
+def summarize_with_batch_api(docs: list[dict[str, Any]], max_workers: int = 8) -> list[dict[str, Any]]:
+    """Summarize docs through the OpenAI Batch API, one request per document; order matches docs.
+
+    Cached responses are used directly. Documents the batch does not return (or every document,
+    if the batch fails or times out) are summarized with regular requests instead; the reason is
+    kept in their `llm_batch_api_error` and printed to stderr.
+    """
+    records: list[dict[str, Any]] = []
+    pending: dict[str, tuple[dict[str, Any], dict[str, Any], str, bytes]] = {}
+    for i, d in enumerate(docs):
+        payload, prepared = _prepare_payload(d)
+        records.append(payload)
+        if not prepared:
+            continue
+        req_body = _solo_request_body({**d, "read_strategy": payload["read_strategy"]}, prepared)
+        cached = _RESPONSE_CACHE.get(_RESPONSE_CACHE.key(req_body)) if _RESPONSE_CACHE else None
+        if cached is not None:
+            _apply_llm_result(payload, loads(cached))
+            continue
+        pending[f"doc-{i}"] = (d, payload, prepared, req_body)
+
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    responses: dict[str, dict[str, Any]] = {}
+    errors: dict[str, str] = {}
+    batch_error = "" if api_key else "OPENAI_API_KEY is not set"
+    if pending and api_key:
+        lines = [request_line(cid, "/v1/chat/completions", item[3]) for cid, item in pending.items()]
+        try:
+            responses, errors = run_batch(
+                _CLIENT, api_key, lines, poll_seconds=BATCH_API_POLL_SEC, max_wait_seconds=BATCH_API_MAX_WAIT_SEC
+            )
+        except (BatchError, OSError, http.client.HTTPException, ValueError, KeyError) as exc:
+            batch_error = f"batch failed: {exc}"
+            print(f"step8: {batch_error}; summarizing {len(pending)} documents with regular requests", file=sys.stderr)
+
+    fallback: list[tuple[dict[str, Any], dict[str, Any], str]] = []
+    for cid, (d, payload, prepared, req_body) in pending.items():
+        try:
+            content = responses[cid]["choices"][0]["message"]["content"]
+            llm = loads(content)
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            if cid in responses:
+                reason = f"unreadable batch response: {exc!r}"
+            else:
+                reason = errors.get(cid) or batch_error or "missing from batch output"
+            payload["llm_batch_api_error"] = reason
+            if not batch_error:
+                print(f"step8: batch request {cid} ({d.get('title', '')}) fell back: {reason}", file=sys.stderr)
+            fallback.append((d, payload, prepared))
+            continue
+        if _RESPONSE_CACHE:
+            _RESPONSE_CACHE.put(_RESPONSE_CACHE.key(req_body), content)
+        payload["llm_batch_api"] = True
+        _apply_llm_result(payload, llm)
+
+    if fallback:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(fallback)))) as ex:
+            list(ex.map(lambda item: _summarize_prepared(*item), fallback))
+    return records
+
+
+def _pack_batch(
+    items: list[tuple[dict[str, Any], dict[str, Any], str]],
+    budget_chars: int = BATCH_BUDGET_CHARS,
+) -> tuple[list[list[tuple[dict[str, Any], dict[str, Any], str]]], list[tuple[dict[str, Any], dict[str, Any], str]]]:
+    """Greedily group small text documents under budget_chars; returns (batches, solo items)."""
+    batches: list[list[tuple[dict[str, Any], dict[str, Any], str]]] = []
+    solo: list[tuple[dict[str, Any], dict[str, Any], str]] = []
+    current: list[tuple[dict[str, Any], dict[str, Any], str]] = []
+    current_chars = 0
+    for item in items:
+        doc, _, prepared = item
+        if (
+            budget_chars <= 0
+            or doc.get("document_type") == "powerpoint_like"
+            or len(prepared) > min(BATCH_SOLO_MIN_CHARS, budget_chars)
+        ):
+            solo.append(item)
+            continue
+        if current and current_chars + len(prepared) > budget_chars:
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(item)
+        current_chars += len(prepared)
+    if current:
+        batches.append(current)
+
+    # A batch of one gains nothing over the regular per-document request.
+    solo.extend(b[0] for b in batches if len(b) == 1)
+    return [b for b in batches if len(b) > 1], solo
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Step 8 material summarizer")
     parser.add_argument("--run-id", required=True, help="Run identifier")
@@ -299,19 +688,41 @@ def main() -> int:
         default="",
         help="Step8 result path (default: tmp/runs/<run_id>/step8-material-summaries.json)",
     )
-    parser.add_argument("--max-workers", type=int, default=2, help="Parallel workers for per-doc LLM summaries")
+    parser.add_argument("--max-workers", type=int, default=8, help="Parallel workers for per-doc LLM summaries")
+    parser.add_argument("--rpm", type=int, default=0, help="Max LLM requests per minute (0: unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Max estimated LLM tokens per minute (0: unlimited)")
+    parser.add_argument(
+        "--batch-budget-chars",
+        type=int,
+        default=BATCH_BUDGET_CHARS,
+        help="Pack small text documents into one LLM request up to this many prepared chars (0: disable)",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse LLM responses for unchanged requests from <tmp-root>/_cache/step8/cache.db",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Submit all summaries as one OpenAI Batch API job (asynchronous, lower cost) and wait for it",
+    )
     args = parser.parse_args()
+    configure_rate_limits(args.rpm, args.tpm)
 
     run_dir = Path(args.tmp_root) / args.run_id
     run_dir.mkdir(parents=True, exist_ok=True)
+    configure_cache(default_cache_path(run_dir) if args.cache else None)
     step7_path = Path(args.step7_file) if args.step7_file else run_dir / "step7-conversion.json"
     out_path = Path(args.output_file) if args.output_file else run_dir / "step8-material-summaries.json"
 
-    raw = _read_text(step7_path)
+    raw = read_bytes(step7_path)
     if not raw:
         raise SystemExit(f"step7 file not found or empty: {step7_path}")
     try:
-        step7 = json.loads(raw)
+        step7 = loads(raw)
     except json.JSONDecodeError as exc:
         raise SystemExit(f"invalid step7 json: {exc}") from exc
 
@@ -319,24 +730,49 @@ def main() -> int:
     if not isinstance(docs, list):
         raise SystemExit("invalid step7 json: converted_documents must be a list")
 
-    workers = max(1, min(args.max_workers, max(1, len(docs))))
-    summarized: list[dict[str, Any]] = []
-    with ThreadPoolExecutor(max_workers=workers) as ex:
-        futures = [ex.submit(_summarize_one, d) for d in docs]
-        for fut in as_completed(futures):
-            summarized.append(fut.result())
-    summarized_sorted = sorted(summarized, key=lambda x: x.get("title", ""))
-
-    payload = {
+    # Records go into a title-ordered heap as they finish; (title, seq) keeps ties in arrival order.
+    summarized: list[tuple[str, int, dict[str, Any]]] = []
+    seq = count()
+
+    def _push(record: dict[str, Any]) -> None:
+        heapq.heappush(summarized, (str(record.get("title", "")), next(seq), record))
+
+    if args.batch_api:
+        workers = max(1, args.max_workers)
+        for record in summarize_with_batch_api(docs, max_workers=workers):
+            _push(record)
+    else:
+        prepared_items: list[tuple[dict[str, Any], dict[str, Any], str]] = []
+        for d in docs:
+            payload, prepared = _prepare_payload(d)
+            if prepared:
+                prepared_items.append((d, payload, prepared))
+            else:
+                _push(payload)
+        batches, solo = _pack_batch(prepared_items, budget_chars=args.batch_budget_chars)
+
+        workers = max(1, min(args.max_workers, max(1, len(batches) + len(solo))))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(_summarize_batch, b) for b in batches]
+            futures += [ex.submit(_summarize_prepared, *item) for item in solo]
+            for fut in as_completed(futures):
+                result = fut.result()
+                for record in result if isinstance(result, list) else [result]:
+                    _push(record)
+    summarized_sorted = (heapq.heappop(summarized)[2] for _ in range(len(summarized)))
+
+    head = {
         "run_id": args.run_id,
         "inputs": {
             "step7_file": str(step7_path),
             "max_workers": workers,
             "model": OPENAI_MODEL,
+            "batch_budget_chars": args.batch_budget_chars,
+            "batch_api": args.batch_api,
         },
-        "per_document": summarized_sorted,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Serialize per-document records one by one instead of building the whole JSON string.
+    write_json_records(out_path, head, "per_document", summarized_sorted)
     print(str(out_path))
     return 0
 
@@ -4,16 +4,81 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import http.client
 import json
 import os
+import random
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any
-from urllib import error, request
+from typing import Any, Optional
+
+from json_io import dumps_compact, load_path, loads, write_json_atomic
+from llm_http import KeepAliveClient
 
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 OPENAI_MODEL = os.getenv("SUMMARYREPORT_STEP9_MODEL", "gpt-5-mini")
+_CLIENT = KeepAliveClient(OPENAI_API_BASE)
+LLM_MAX_ATTEMPTS = 3
+# Set by --stream: request SSE chat completions and assemble the content from deltas.
+STREAM_RESPONSES = False
+# Set by --cache: exact-match response cache directory.
+_CACHE_DIR: Optional[Path] = None
+# raw_body_text is sent only when the Step4 digest is empty unless SUMMARYREPORT_STEP9_INCLUDE_RAW=1.
+INCLUDE_RAW_BODY = os.getenv("SUMMARYREPORT_STEP9_INCLUDE_RAW", "0") == "1"
+
+_OPENING_RE = re.compile(r"^(本資料|この資料|本書|本報告書|本文書)は[、,\s]*")
+_META_LEADIN_PATS = (
+    re.compile(r"^.{0,120}を掲載するページ。"),
+    re.compile(r"^.{0,120}をまとめたページ。"),
+    re.compile(r"^.{0,120}のページ。"),
+)
+# Absence sentences are dropped and whitespace runs collapsed in a single pass.
+# Sentences never span "。", so dropping one cannot create a new match elsewhere.
+_ABSENCE_OR_SPACE_RE = re.compile(
+    r"[^。]*議事録[^。]*(?:未公開|公開されていない|未取得|確認できない|ない)[^。]*。"
+    r"|[^。]*資料[^。]*(?:未取得|不足|存在しない|ない|確認できない)[^。]*。"
+    r"|[^。]*逐語的詳細[^。]*(?:確認できない|不明)[^。]*。"
+    r"|(?P<ws>\s{2,})"
+)
+_AGENDA_REMOVE_RE = re.compile(r"議事次第(?:\s*[:：]\s*|は)")
+# Literal rewrites applied in one pass. "配布" + a page phrase maps straight to "本会合では",
+# matching the old sequential replace followed by the "配布本会合では" fix-up.
+_CLEANUP_LITERAL = {
+    "会議案内には": "本会合では",
+    "ページ上では": "本会合では",
+    "ページには": "本会合では",
+    "ページ上には": "本会合では",
+    "掲載されている": "示されている",
+    "主要議題とする。": "主要議題とした。",
+    "主要議題とする": "主要議題とした",
+    "配布本会合では": "本会合では",
+    **{f"配布{k}": "本会合では" for k in ("会議案内には", "ページ上では", "ページには", "ページ上には")},
+}
+# Longest keys first so overlapping alternatives prefer the longer literal.
+_CLEANUP_LITERAL_RE = re.compile("|".join(map(re.escape, sorted(_CLEANUP_LITERAL, key=len, reverse=True))))
+_DISTRIBUTED_LEADIN_RE = re.compile(r"^(.{0,120}?)(?:では、|は、)?[^。]{0,220}?配布され、")
+_POSTED_LEADIN_RE = re.compile(r"^(.{0,120}?)(?:では、|は、)?[^。]{0,220}?が掲載され、")
+_AGENDA_MEETING_LEADIN_RE = re.compile(r"^(.{0,120}?)議事次第\s*本会合では")
+_AGENDA_LEADIN_RE = re.compile(r"^(.{0,120}?)議事次第\s*では")
+_ROUND_REPEAT_RE = re.compile(r"(第[0-9０-９]+回)\s+\1")
+_PAREN_ROUND_REPEAT_RE = re.compile(r"（(第[0-9０-９]+回)）\s*\1の")
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+# Anything _cleanup_meta_phrasing could rewrite; text without a match passes through it unchanged.
+_CLEANUP_TRIGGER_RE = re.compile(
+    r"議事次第|配布され、|が掲載され、|(第[0-9０-９]+回)\s+\1|\s{2,}|"
+    + "|".join(map(re.escape, _CLEANUP_LITERAL))
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_BANNED_META_RE = re.compile(
+    r"議事次第\s*(?:[:：]|本会合では|では)"
+    r"|ページには|ページ上では|会議案内には|以下の資料|配布資料|配布された|掲載資料|資料が掲載"
+)
+_OPERATIONAL_MEETING_RE = re.compile("開会|閉会|開催日時|開催場所|会場|会議室|合同庁舎|永田町|挨拶|日時|場所")
 
 
 def _sanitize_for_api_json(value: Any) -> Any:
@@ -27,19 +92,17 @@ def _sanitize_for_api_json(value: Any) -> Any:
         if value != value or value in (float("inf"), float("-inf")):
             return None
         return value
-    if isinstance(value, str):
-        return value.encode("utf-8", "replace").decode("utf-8")
+    # Strings pass through untouched: dumps_compact already replaces lone surrogates,
+    # so the embedded payload text is not re-encoded once per string here.
     return value
 
 
 def _api_json_bytes(payload: dict[str, Any]) -> bytes:
-    sanitized = _sanitize_for_api_json(payload)
-    return json.dumps(
-        sanitized,
-        ensure_ascii=True,
-        allow_nan=False,
-        separators=(",", ":"),
-    ).encode("utf-8")
+    return dumps_compact(_sanitize_for_api_json(payload))
+
+
+def _json_text(value: Any) -> str:
+    return dumps_compact(value).decode("utf-8")
 
 
 def _read_text(path: Path) -> str:
@@ -49,11 +112,8 @@ def _read_text(path: Path) -> str:
 
 
 def _read_json(path: Path) -> dict[str, Any]:
-    raw = _read_text(path)
-    if not raw:
-        return {}
     try:
-        parsed = json.loads(raw)
+        parsed = load_path(path)
     except json.JSONDecodeError:
         return {}
     if not isinstance(parsed, dict):
@@ -62,11 +122,8 @@ def _read_json(path: Path) -> dict[str, Any]:
 
 
 def _read_json_list(path: Path) -> list[Any]:
-    raw = _read_text(path)
-    if not raw:
-        return []
     try:
-        parsed = json.loads(raw)
+        parsed = load_path(path)
     except json.JSONDecodeError:
         return []
     if not isinstance(parsed, list):
@@ -125,137 +182,157 @@ def _step9_polish_schema() -> dict[str, Any]:
     }
 
 
-def _call_llm(system_prompt: str, user_payload: dict[str, Any]) -> dict[str, Any]:
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
+def configure_streaming(enabled: bool) -> None:
+    global STREAM_RESPONSES
+    STREAM_RESPONSES = enabled
 
-    body = {
-        "model": OPENAI_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
-        ],
-        "response_format": {
-            "type": "json_schema",
-            "json_schema": {"name": "step9_integrated_summary", "schema": _step9_schema(), "strict": True},
-        },
-    }
 
-    req = request.Request(
-        f"{OPENAI_API_BASE}/chat/completions",
-        data=_api_json_bytes(body),
-        method="POST",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-    )
-    try:
-        with request.urlopen(req, timeout=240) as resp:
-            raw = resp.read()
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"LLM request failed: {exc.code} {detail}") from exc
-    except error.URLError as exc:
-        raise RuntimeError(f"LLM request failed: {exc}") from exc
+def configure_cache(cache_dir: Optional[Path]) -> None:
+    """Store and reuse LLM results as <cache_dir>/<sha256 of request>.json (None disables)."""
+    global _CACHE_DIR
+    _CACHE_DIR = cache_dir
 
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    content = data["choices"][0]["message"]["content"]
-    return json.loads(content)
 
+def _response_content(raw: bytes) -> str:
+    """Return the assistant message content from a plain or SSE-streamed chat completion body."""
+    if not STREAM_RESPONSES:
+        data = loads(raw)
+        return data["choices"][0]["message"]["content"]
+    parts: list[str] = []
+    for line in raw.splitlines():
+        if not line.startswith(b"data:"):
+            continue
+        chunk = line[5:].strip()
+        if chunk == b"[DONE]":
+            break
+        choices = loads(chunk).get("choices") or []
+        if choices:
+            parts.append((choices[0].get("delta") or {}).get("content") or "")
+    return "".join(parts)
 
-def _call_llm_polish(polish_payload: dict[str, Any]) -> dict[str, Any]:
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
 
-    system_prompt = (
-        "You are a Japanese editor. "
-        "Polish wording and readability only; preserve all factual content and coverage. "
-        "Do not add or remove substantive points. "
-        "Keep concise abstract style and natural openings."
-    )
-    body = {
-        "model": OPENAI_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(polish_payload, ensure_ascii=False)},
-        ],
-        "response_format": {
-            "type": "json_schema",
-            "json_schema": {"name": "step9_polish", "schema": _step9_polish_schema(), "strict": True},
-        },
-    }
+def _cache_path(req_body: bytes) -> Optional[Path]:
+    if _CACHE_DIR is None:
+        return None
+    return _CACHE_DIR / f"{hashlib.sha256(req_body).hexdigest()}.json"
 
-    req = request.Request(
-        f"{OPENAI_API_BASE}/chat/completions",
-        data=_api_json_bytes(body),
-        method="POST",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-    )
+
+def _read_cached(path: Path) -> Optional[dict[str, Any]]:
     try:
-        with request.urlopen(req, timeout=180) as resp:
-            raw = resp.read()
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"LLM polish failed: {exc.code} {detail}") from exc
-    except error.URLError as exc:
-        raise RuntimeError(f"LLM polish failed: {exc}") from exc
+        cached = load_path(path)
+    except (OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) else None
 
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    content = data["choices"][0]["message"]["content"]
-    return json.loads(content)
 
+def _write_cached(path: Path, parsed: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, parsed)
+
+
+def _retry_sleep(attempt: int) -> None:
+    time.sleep(min(30.0, 2**attempt + random.random()))
+
+
+def _post_chat(body: dict[str, Any], timeout: int, label: str) -> dict[str, Any]:
+    """POST a chat completion over the keep-alive client and parse the JSON message content."""
+    req_body = _api_json_bytes(body)
+    # The key covers model, prompts, payload and schema; streaming does not change the result.
+    cache_path = _cache_path(req_body)
+    if cache_path is not None:
+        cached = _read_cached(cache_path)
+        if cached is not None:
+            return cached
 
-def _call_llm_review(review_payload: dict[str, Any]) -> dict[str, Any]:
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
+    if STREAM_RESPONSES:
+        # Same bytes as dumping {**body, "stream": True}, without re-encoding the embedded payload.
+        req_body = req_body[:-1] + b',"stream":true}'
+
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        last_attempt = attempt + 1 == LLM_MAX_ATTEMPTS
+        try:
+            status, _, raw = _CLIENT.post("/chat/completions", req_body, headers, timeout)
+        except (OSError, http.client.HTTPException) as exc:
+            if last_attempt:
+                raise RuntimeError(f"{label} failed: {exc}") from exc
+            _retry_sleep(attempt)
+            continue
+        if status < 400:
+            break
+        detail = raw.decode("utf-8", errors="replace")
+        # Only rate limiting and server-side errors are transient; other 4xx fail immediately.
+        if last_attempt or (status < 500 and status != 429):
+            raise RuntimeError(f"{label} failed: {status} {detail}")
+        _retry_sleep(attempt)
+    parsed = loads(_response_content(raw))
+    if cache_path is not None and isinstance(parsed, dict):
+        _write_cached(cache_path, parsed)
+    return parsed
 
-    system_prompt = (
-        "You are a strict reviewer for Japanese abstracts. "
-        "Judge whether abstract_ja is valid as an abstract, not just grammatically correct. "
-        "Reject if abstract_ja is mostly page description, link/list explanation, or awkward lead-in. "
-        "Accept only when abstract_ja concisely explains the substantive topic, focus, and scope. "
-        "Use strict acceptance: if you can suggest any wording improvement (readability, opening, phrasing, flow), "
-        "then set is_ok=false and needs_regeneration=true. "
-        "Only return is_ok=true when no improvement is needed."
-    )
+
+_POLISH_SYSTEM_PROMPT = (
+    "You are a Japanese editor. "
+    "Polish wording and readability only; preserve all factual content and coverage. "
+    "Do not add or remove substantive points. "
+    "Keep concise abstract style and natural openings."
+)
+_REVIEW_SYSTEM_PROMPT = (
+    "You are a strict reviewer for Japanese abstracts. "
+    "Judge whether abstract_ja is valid as an abstract, not just grammatically correct. "
+    "Reject if abstract_ja is mostly page description, link/list explanation, or awkward lead-in. "
+    "Accept only when abstract_ja concisely explains the substantive topic, focus, and scope. "
+    "Use strict acceptance: if you can suggest any wording improvement (readability, opening, phrasing, flow), "
+    "then set is_ok=false and needs_regeneration=true. "
+    "Only return is_ok=true when no improvement is needed."
+)
+
+
+def _chat(
+    system_prompt: str,
+    user_content: str,
+    schema_name: str,
+    schema: dict[str, Any],
+    timeout: int,
+    label: str,
+) -> dict[str, Any]:
     body = {
         "model": OPENAI_MODEL,
         "messages": [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(review_payload, ensure_ascii=False)},
+            {"role": "user", "content": user_content},
         ],
         "response_format": {
             "type": "json_schema",
-            "json_schema": {"name": "step9_quality_review", "schema": _step9_review_schema(), "strict": True},
+            "json_schema": {"name": schema_name, "schema": schema, "strict": True},
         },
     }
+    return _post_chat(body, timeout=timeout, label=label)
+
+
+def _call_llm(system_prompt: str, user_content: str) -> dict[str, Any]:
+    """`user_content` is the payload already serialized with _json_text, so retries reuse it."""
+    return _chat(system_prompt, user_content, "step9_integrated_summary", _step9_schema(), 240, "LLM request")
+
+
+def _call_llm_polish(polish_payload: dict[str, Any]) -> dict[str, Any]:
+    return _chat(_POLISH_SYSTEM_PROMPT, _json_text(polish_payload), "step9_polish", _step9_polish_schema(), 180, "LLM polish")
 
-    req = request.Request(
-        f"{OPENAI_API_BASE}/chat/completions",
-        data=_api_json_bytes(body),
-        method="POST",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-    )
-    try:
-        with request.urlopen(req, timeout=180) as resp:
-            raw = resp.read()
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"LLM review failed: {exc.code} {detail}") from exc
-    except error.URLError as exc:
-        raise RuntimeError(f"LLM review failed: {exc}") from exc
 
-    data = json.loads(raw.decode("utf-8", errors="replace"))
-    content = data["choices"][0]["message"]["content"]
-    return json.loads(content)
+def _call_llm_review(review_payload: dict[str, Any]) -> dict[str, Any]:
+    return _chat(
+        _REVIEW_SYSTEM_PROMPT, _json_text(review_payload), "step9_quality_review", _step9_review_schema(), 180, "LLM review"
+    )
 
 
 def _normalize_summary_opening(text: str) -> str:
     if not text:
         return text
     normalized = text.strip()
-    normalized = re.sub(r"^(本資料|この資料|本書|本報告書|本文書)は[、,\s]*", "", normalized)
+    normalized = _OPENING_RE.sub("", normalized)
     return normalized
 
 
@@ -263,12 +340,7 @@ def _strip_meta_page_leadin(text: str) -> str:
     if not text:
         return text
     t = text.strip()
-    patterns = [
-        re.compile(r"^.{0,120}を掲載するページ。"),
-        re.compile(r"^.{0,120}をまとめたページ。"),
-        re.compile(r"^.{0,120}のページ。"),
-    ]
-    for pat in patterns:
+    for pat in _META_LEADIN_PATS:
         m = pat.match(t)
         if m:
             rest = t[m.end() :].lstrip()
@@ -280,87 +352,48 @@ def _strip_meta_page_leadin(text: str) -> str:
 def _strip_absence_statements(text: str) -> str:
     if not text:
         return text
-    t = text
-    patterns = [
-        r"[^。]*議事録[^。]*(未公開|公開されていない|未取得|確認できない|ない)[^。]*。",
-        r"[^。]*資料[^。]*(未取得|不足|存在しない|ない|確認できない)[^。]*。",
-        r"[^。]*逐語的詳細[^。]*(確認できない|不明)[^。]*。",
-    ]
-    for p in patterns:
-        t = re.sub(p, "", t)
-    t = re.sub(r"\n{3,}", "\n\n", t)
-    t = re.sub(r"\s{2,}", " ", t).strip()
-    return t
+    return _ABSENCE_OR_SPACE_RE.sub(lambda m: " " if m.group("ws") else "", text).strip()
+
+
+def _cleanup_literal(m: re.Match[str]) -> str:
+    return _CLEANUP_LITERAL[m.group(0)]
 
 
 def _cleanup_meta_phrasing(text: str) -> str:
     if not text:
         return text
-    t = text
-    t = re.sub(r"議事次第\s*[:：]\s*", "", t)
-    t = re.sub(r"議事次第は", "", t)
-    t = re.sub(r"会議案内には", "本会合では", t)
-    t = re.sub(r"ページ上では", "本会合では", t)
-    t = t.replace("ページには", "本会合では")
-    t = t.replace("ページ上には", "本会合では")
-    t = t.replace("掲載されている", "示されている")
-    t = t.replace("主要議題とする。", "主要議題とした。")
-    t = t.replace("主要議題とする", "主要議題とした")
-    t = t.replace("配布本会合では", "本会合では")
+    t = _AGENDA_REMOVE_RE.sub("", text)
+    t = _CLEANUP_LITERAL_RE.sub(_cleanup_literal, t)
     # Drop page-structure lead-ins like "...資料が配布され、" and keep substantive sentence.
-    t = re.sub(r"^(.{0,120}?)(?:では、|は、)?[^。]{0,220}?配布され、", r"\1では、", t)
-    t = re.sub(r"^(.{0,120}?)(?:では、|は、)?[^。]{0,220}?が掲載され、", r"\1では、", t)
+    t = _DISTRIBUTED_LEADIN_RE.sub(r"\1では、", t)
+    t = _POSTED_LEADIN_RE.sub(r"\1では、", t)
     # Normalize awkward lead-in like "...議事次第 本会合では"
-    t = re.sub(r"^(.{0,120}?)議事次第\s*本会合では", r"\1では", t)
-    t = re.sub(r"^(.{0,120}?)議事次第\s*では", r"\1では", t)
-    t = re.sub(r"(第[0-9０-９]+回)\s+\1", r"\1", t)
-    t = re.sub(r"\s{2,}", " ", t).strip()
+    t = _AGENDA_MEETING_LEADIN_RE.sub(r"\1では", t)
+    t = _AGENDA_LEADIN_RE.sub(r"\1では", t)
+    t = _ROUND_REPEAT_RE.sub(r"\1", t)
+    t = _MULTI_SPACE_RE.sub(" ", t).strip()
     return t
 
 
 def _contains_banned_meta_phrase(text: str) -> bool:
     if not text:
         return False
-    patterns = [
-        r"議事次第\s*[:：]",
-        r"議事次第\s*本会合では",
-        r"議事次第\s*では",
-        r"ページには",
-        r"ページ上では",
-        r"会議案内には",
-        r"以下の資料",
-        r"配布資料",
-        r"配布された",
-        r"掲載資料",
-        r"資料が掲載",
-    ]
-    return any(re.search(p, text) is not None for p in patterns)
+    return _BANNED_META_RE.search(text) is not None
 
 
 def _contains_operational_meeting_phrases(text: str) -> bool:
     if not text:
         return False
-    patterns = [
-        r"開会",
-        r"閉会",
-        r"開催日時",
-        r"開催場所",
-        r"会場",
-        r"会議室",
-        r"合同庁舎",
-        r"永田町",
-        r"挨拶",
-        r"日時",
-        r"場所",
-    ]
-    return any(re.search(p, text) is not None for p in patterns)
+    return _OPERATIONAL_MEETING_RE.search(text) is not None
 
 
 def _missing_required_subject(abstract: str, meeting_name: str) -> bool:
     if not meeting_name.strip():
         return False
-    normalized_abstract = re.sub(r"\s+", "", abstract)
-    normalized_name = re.sub(r"\s+", "", meeting_name)
+    if meeting_name in abstract:
+        return False
+    normalized_abstract = _WHITESPACE_RE.sub("", abstract)
+    normalized_name = _WHITESPACE_RE.sub("", meeting_name)
     if normalized_name in normalized_abstract:
         return False
     if "（" in normalized_name:
@@ -375,14 +408,19 @@ def _dedupe_round_repetition(text: str) -> str:
         return text
     t = text
     # e.g. "会議（第１８回）第１８回の..." -> "会議（第１８回）の..."
-    t = re.sub(
-        r"（(第[0-9０-９]+回)）\s*\1の",
-        r"（\1）の",
-        t,
-    )
+    t = _PAREN_ROUND_REPEAT_RE.sub(r"（\1）の", t)
     # generic fallback: "...第18回 第18回..."
-    t = re.sub(r"(第[0-9０-９]+回)\s+\1", r"\1", t)
-    return re.sub(r"\s{2,}", " ", t).strip()
+    t = _ROUND_REPEAT_RE.sub(r"\1", t)
+    return _MULTI_SPACE_RE.sub(" ", t).strip()
+
+
+def _finalize_text(text: str) -> str:
+    t = _dedupe_round_repetition(_strip_absence_statements(_cleanup_meta_phrasing(text)))
+    # Final hard guard for recurring meta phrases. Without a trigger the cleanup would be a no-op,
+    # so it only re-runs when absence removal or dedupe exposed something new.
+    if _CLEANUP_TRIGGER_RE.search(t):
+        t = _cleanup_meta_phrasing(t)
+    return t
 
 
 def _minutes_note_metadata(page_type: str, minutes_available: bool) -> str:
@@ -473,34 +511,35 @@ def _build_user_payload(
     if not isinstance(docs, list):
         docs = []
 
-    normalized_docs: list[dict[str, Any]] = []
-    for d in docs:
-        if not isinstance(d, dict):
-            continue
-        normalized_docs.append(
-            {
-                "title": d.get("title", ""),
-                "document_type": d.get("document_type", ""),
-                "summary": _trim_chars(str(d.get("summary", "")), 2500),
-                "key_points": d.get("key_points", [])[:8] if isinstance(d.get("key_points"), list) else [],
-                "empty_content": bool(d.get("empty_content", False)),
-            }
-        )
+    normalized_docs = [
+        {
+            "title": d.get("title", ""),
+            "document_type": d.get("document_type", ""),
+            "summary": _trim_chars(str(d.get("summary", "")), 2500),
+            "key_points": kp[:8] if isinstance(kp := d.get("key_points"), list) else [],
+            "empty_content": bool(d.get("empty_content", False)),
+        }
+        for d in docs
+        if isinstance(d, dict)
+    ]
+    # Empty materials carry no content, only input tokens.
+    normalized_docs = [d for d in normalized_docs if not d["empty_content"] and (d["summary"] or d["key_points"])]
 
+    # A MEETING page without minutes is summarized from its materials; the bare link list only adds tokens.
+    # When there are no usable materials, the links are kept as the only agenda signal.
+    skip_links = page_type.upper() == "MEETING" and not minutes_available and bool(normalized_docs)
     linked_documents: list[dict[str, str]] = []
-    for item in pdf_links:
-        if not isinstance(item, dict):
-            continue
-        linked_documents.append(
+    if not skip_links:
+        linked_documents = [
             {
                 "title": str(item.get("text", "")),
                 "url": str(item.get("url", "")),
             }
-        )
-        if len(linked_documents) >= 20:
-            break
+            for item in islice((item for item in pdf_links if isinstance(item, dict)), 20)
+        ]
 
     minutes_excerpt = _trim_chars(minutes_md, 4000) if minutes_available else ""
+    digest_ja = _trim_chars(str(body_digest.get("digest_ja", "")), 6000)
 
     return {
         "page_type": page_type,
@@ -518,14 +557,19 @@ def _build_user_payload(
         "body_digest": {
             "available": bool(body_digest),
             "source_type": str(body_digest.get("source_type", "none")),
-            "digest_ja": _trim_chars(str(body_digest.get("digest_ja", "")), 6000),
+            "digest_ja": digest_ja,
             "key_points": (
                 body_digest.get("key_points", [])[:12]
                 if isinstance(body_digest.get("key_points"), list)
                 else []
             ),
-            # Keep raw text for traceability and edge cases; truncated for token control.
-            "raw_body_text": _trim_chars(str(body_digest.get("raw_body_text", "")), 12000),
+            # Raw text is a fallback for a missing digest; truncated for token control
+            # (tighter when material summaries already cover the content).
+            "raw_body_text": (
+                _trim_chars(str(body_digest.get("raw_body_text", "")), 6000 if normalized_docs else 12000)
+                if INCLUDE_RAW_BODY or not digest_ja.strip()
+                else ""
+            ),
         },
     }
 
@@ -553,15 +597,12 @@ def _sentence_split(text: str) -> list[str]:
     return [p.strip() for p in parts if p.strip()]
 
 
+_CONNECTIVE_RE = re.compile("本日は、|また、|そして、|具体的には、|このため、|特に、")
+
+
 def _compact_sentence(text: str) -> str:
-    s = re.sub(r"\s+", " ", text).strip()
-    s = s.replace("本日は、", "")
-    s = s.replace("また、", "")
-    s = s.replace("そして、", "")
-    s = s.replace("具体的には、", "")
-    s = s.replace("このため、", "")
-    s = s.replace("特に、", "")
-    return s
+    s = _WHITESPACE_RE.sub(" ", text).strip()
+    return _CONNECTIVE_RE.sub("", s)
 
 
 def _build_prime_minister_abstract(subject: str, points: list[str], sentences: list[str]) -> str:
@@ -628,22 +669,56 @@ def _fallback_prime_minister_summary(
     }
 
 
-def _generate_with_retry(system_prompt: str, payload: dict[str, Any]) -> dict[str, Any]:
-    first = _call_llm(system_prompt, payload)
+def _accept_first(first: dict[str, Any]) -> bool:
     abstract = _normalize_summary_opening(str(first.get("abstract_ja", "")).strip())
-    if len(abstract) <= 1500:
-        first["abstract_ja"] = abstract
-        return first
+    if len(abstract) > 1500:
+        return False
+    first["abstract_ja"] = abstract
+    return True
 
+
+def _finish_retry(second: dict[str, Any]) -> dict[str, Any]:
+    abstract = _normalize_summary_opening(str(second.get("abstract_ja", "")).strip())
+    second["abstract_ja"] = _trim_chars(abstract, 1500)
+    return second
+
+
+def _generate_with_retry(system_prompt: str, payload: dict[str, Any]) -> dict[str, Any]:
     retry_prompt = (
         system_prompt
         + " Retry mode: shorten abstract_ja to <=1500 chars while preserving key policy points and decisions."
     )
-    second = _call_llm(retry_prompt, payload)
-    second["abstract_ja"] = _normalize_summary_opening(str(second.get("abstract_ja", "")).strip())
-    if len(second["abstract_ja"]) > 1500:
-        second["abstract_ja"] = _trim_chars(second["abstract_ja"], 1500)
-    return second
+    # Serialize the payload once; both attempts share it.
+    user_content = dumps_compact(payload).decode("utf-8")
+    first = _call_llm(system_prompt, user_content)
+    if _accept_first(first):
+        return first
+    return _finish_retry(_call_llm(retry_prompt, user_content))
+
+
+def _local_review_verdict(abstract: str, overall: str, page_type: str, meeting_name: str) -> Optional[dict[str, Any]]:
+    """Deterministic review overrides; when several apply, the later check wins as before."""
+    if page_type == "MEETING" and (
+        _contains_operational_meeting_phrases(abstract) or _contains_operational_meeting_phrases(overall)
+    ):
+        return {
+            "is_ok": False,
+            "needs_regeneration": True,
+            "feedback": "MEETING要約本文に運営情報（日時/場所/開会閉会/挨拶）が含まれている",
+        }
+    if _missing_required_subject(abstract, meeting_name):
+        return {
+            "is_ok": False,
+            "needs_regeneration": True,
+            "feedback": "meeting_nameがあるのにabstract_ja先頭文で会議名/報告書名が明示されていない",
+        }
+    if _contains_banned_meta_phrase(abstract) or _contains_banned_meta_phrase(overall):
+        return {
+            "is_ok": False,
+            "needs_regeneration": True,
+            "feedback": "禁止メタ表現（例: 議事次第：/議事次第 本会合では/ページには/以下の資料）が残っている",
+        }
+    return None
 
 
 def _review_and_regenerate(
@@ -655,52 +730,42 @@ def _review_and_regenerate(
     history: list[dict[str, Any]] = []
     current = generated
     polished_once = False
+    # The review payload only varies with these fields; an unchanged polish/regeneration reuses the verdict.
+    review_memo: dict[tuple[str, str, str], dict[str, Any]] = {}
 
     for _ in range(max_regen + 1):
         abstract = _normalize_summary_opening(str(current.get("abstract_ja", "")).strip())
         overall = str(current.get("overall_summary_ja", "")).strip()
         page_type = str(user_payload.get("page_type", "")).upper().strip()
-        review_payload = {
-            "summary_context": {
-                "page_type": user_payload.get("page_type", ""),
-                "meeting_name": user_payload.get("meeting_name", ""),
-                "materials_count": len(user_payload.get("materials", []) or []),
-                "minutes_available": bool((user_payload.get("minutes") or {}).get("available", False)),
-            },
-            "abstract_ja": abstract,
-            "overall_summary_ja": overall,
-            "criteria": [
-                "abstract_jaが要約（Abstract）として成立していること（ページ紹介文ではない）",
-                "対象・論点・検討範囲が簡潔に記述されていること",
-                "資料名列挙やリンク案内に偏っていないこと",
-                "『資料が配布/掲載された』等のページ構造説明に寄らず、実質的内容の要約であること",
-                "meeting_nameがある場合、abstract_jaの先頭文に会議名/報告書名が明示されていること",
-                "文頭が不自然でないこと（例: 『議事次第 本会合では』のような形を避ける）",
-                "MEETINGの要約本文では日時/場所/開会閉会/挨拶など運営情報を主内容にしないこと（議題・政策論点中心）",
-            ],
-        }
-        review = _call_llm_review(review_payload)
-        if _contains_banned_meta_phrase(abstract) or _contains_banned_meta_phrase(overall):
-            review = {
-                "is_ok": False,
-                "needs_regeneration": True,
-                "feedback": "禁止メタ表現（例: 議事次第：/議事次第 本会合では/ページには/以下の資料）が残っている",
-            }
         meeting_name = str(user_payload.get("meeting_name", "")).strip()
-        if _missing_required_subject(abstract, meeting_name):
-            review = {
-                "is_ok": False,
-                "needs_regeneration": True,
-                "feedback": "meeting_nameがあるのにabstract_ja先頭文で会議名/報告書名が明示されていない",
-            }
-        if page_type == "MEETING" and (
-            _contains_operational_meeting_phrases(abstract) or _contains_operational_meeting_phrases(overall)
-        ):
-            review = {
-                "is_ok": False,
-                "needs_regeneration": True,
-                "feedback": "MEETING要約本文に運営情報（日時/場所/開会閉会/挨拶）が含まれている",
+        guard = _local_review_verdict(abstract, overall, page_type, meeting_name)
+        # Local guards would override the LLM verdict anyway, so only ask the reviewer when they pass.
+        review = guard
+        review_key = (abstract, overall, page_type)
+        if review is None and review_key in review_memo:
+            review = review_memo[review_key]
+        if review is None:
+            review_payload = {
+                "summary_context": {
+                    "page_type": user_payload.get("page_type", ""),
+                    "meeting_name": user_payload.get("meeting_name", ""),
+                    "materials_count": len(user_payload.get("materials", []) or []),
+                    "minutes_available": bool((user_payload.get("minutes") or {}).get("available", False)),
+                },
+                "abstract_ja": abstract,
+                "overall_summary_ja": overall,
+                "criteria": [
+                    "abstract_jaが要約（Abstract）として成立していること（ページ紹介文ではない）",
+                    "対象・論点・検討範囲が簡潔に記述されていること",
+                    "資料名列挙やリンク案内に偏っていないこと",
+                    "『資料が配布/掲載された』等のページ構造説明に寄らず、実質的内容の要約であること",
+                    "meeting_nameがある場合、abstract_jaの先頭文に会議名/報告書名が明示されていること",
+                    "文頭が不自然でないこと（例: 『議事次第 本会合では』のような形を避ける）",
+                    "MEETINGの要約本文では日時/場所/開会閉会/挨拶など運営情報を主内容にしないこと（議題・政策論点中心）",
+                ],
             }
+            review = _call_llm_review(review_payload)
+            review_memo[review_key] = review
         history.append(review)
         feedback = str(review.get("feedback", "")).strip()
         if bool(review.get("is_ok")) and not bool(review.get("needs_regeneration")):
@@ -751,7 +816,20 @@ def main() -> int:
     parser.add_argument("--step8-file", default="", help="step8-material-summaries.json path")
     parser.add_argument("--pdf-links-file", default="", help="pdf-links.json path")
     parser.add_argument("--output-file", default="", help="Step9 output path")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream LLM responses (SSE); the JSON result is still parsed after the message completes",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse LLM results for identical requests from <tmp-root>/_cache/step9/",
+    )
     args = parser.parse_args()
+    configure_streaming(args.stream)
+    configure_cache(Path(args.tmp_root) / "_cache" / "step9" if args.cache else None)
 
     run_dir = Path(args.tmp_root) / args.run_id
     run_dir.mkdir(parents=True, exist_ok=True)
@@ -767,13 +845,22 @@ def main() -> int:
     body_digest_path = run_dir / "body-digest.json"
     out_path = Path(args.output_file) if args.output_file else run_dir / "step9-summary.json"
 
-    step2 = _read_json(step2_path)
-    step4_source = _read_json(minutes_source_path)
-    step4_extract = _read_json(minutes_extract_path)
-    step8 = _read_json(step8_path)
-    pdf_links = _read_json_list(pdf_links_path)
-    body_digest = _read_json(body_digest_path)
-    minutes_md = _read_text(minutes_md_path)
+    # Inputs are independent; read them concurrently so slow or cold storage does not serialize.
+    with ThreadPoolExecutor(max_workers=7) as ex:
+        step2_f = ex.submit(_read_json, step2_path)
+        step4_source_f = ex.submit(_read_json, minutes_source_path)
+        step4_extract_f = ex.submit(_read_json, minutes_extract_path)
+        step8_f = ex.submit(_read_json, step8_path)
+        pdf_links_f = ex.submit(_read_json_list, pdf_links_path)
+        body_digest_f = ex.submit(_read_json, body_digest_path)
+        minutes_md_f = ex.submit(_read_text, minutes_md_path)
+    step2 = step2_f.result()
+    step4_source = step4_source_f.result()
+    step4_extract = step4_extract_f.result()
+    step8 = step8_f.result()
+    pdf_links = pdf_links_f.result()
+    body_digest = body_digest_f.result()
+    minutes_md = minutes_md_f.result()
 
     if not step2:
         raise SystemExit(f"step2 file not found or invalid: {step2_path}")
@@ -801,15 +888,8 @@ def main() -> int:
 
     abstract = _normalize_summary_opening(str(generated.get("abstract_ja", "")).strip())
     overall = str(generated.get("overall_summary_ja", "")).strip()
-    abstract = _cleanup_meta_phrasing(abstract)
-    overall = _cleanup_meta_phrasing(overall)
-    abstract = _strip_absence_statements(abstract)
-    overall = _strip_absence_statements(overall)
-    abstract = _dedupe_round_repetition(abstract)
-    overall = _dedupe_round_repetition(overall)
-    # Final hard guard for recurring meta phrases.
-    abstract = _cleanup_meta_phrasing(abstract)
-    overall = _cleanup_meta_phrasing(overall)
+    abstract = _finalize_text(abstract)
+    overall = _finalize_text(overall)
     auto_minutes_note = _minutes_note_metadata(page_type, minutes_available)
 
     payload = {
@@ -844,7 +924,7 @@ def main() -> int:
         },
     }
 
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json_atomic(out_path, payload)
     print(str(out_path))
     return 0
 